@@ -6,6 +6,9 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     storage_dir: Path = Path("./storage")
     frontend_url: str = "http://localhost:3000"
+    max_concurrent_separations: int = 1  # jobs running Demucs/DrumSep at once; others wait
+    preload_models: bool = True  # load Demucs + DrumSep at startup instead of on the first job
+    compile_models: bool = False  # torch.compile DrumSep on CUDA (slow first job, faster after)
 
     model_config = {"env_file": "../.env", "env_file_encoding": "utf-8"}
 
@@ -1,13 +1,40 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
 from app.routers import jobs, samples, upload
+from app.services import demucs, drumsep, pipeline
+from app.storage.job_store import job_store
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="DrumTrack API", version="0.1.0")
+
+async def _preload_models() -> None:
+    """Load the separation models in the background so the first job finds them warm."""
+    for name, load in (("Demucs", demucs._get_model), ("DrumSep", drumsep._get_model)):
+        try:
+            await asyncio.to_thread(load)
+        except Exception:
+            logger.exception(f"Preloading {name} failed; it will load on first use")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Don't block startup on model downloads; jobs that arrive first just wait on the load
+    preload = asyncio.create_task(_preload_models()) if settings.preload_models else None
+    yield
+    if preload:
+        preload.cancel()
+    pipeline.shutdown_cpu_pool()
+    job_store.flush()
+
+
+app = FastAPI(title="DrumTrack API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
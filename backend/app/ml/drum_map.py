@@ -26,3 +26,7 @@ DRUM_TYPE_MIN_GAP_MS = {
     "tom_mid": 40,
     "tom_low": 50,
 }
+
+# Same gaps in seconds, for lookups on the dedup path; unknown types use 40 ms
+DRUM_TYPE_MIN_GAP_S = {k: v / 1000.0 for k, v in DRUM_TYPE_MIN_GAP_MS.items()}
+DEFAULT_MIN_GAP_S = 0.040
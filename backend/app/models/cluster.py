@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class ClusterInfo(BaseModel):
@@ -11,6 +11,10 @@ class ClusterInfo(BaseModel):
     representative_time: float  # time of event closest to cluster centroid
 
 
+# Bulk (de)serializer for clusters.json
+cluster_list_adapter = TypeAdapter(list[ClusterInfo])
+
+
 class ClusterUpdateRequest(BaseModel):
     cluster_labels: dict[str, str]  # {cluster_id_str: drum_type}
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class DrumEvent(BaseModel):
@@ -9,3 +9,7 @@ class DrumEvent(BaseModel):
     velocity: int  # 0-127
     confidence: float  # 0-1
     cluster_id: int = -1
+
+
+# Bulk (de)serializer for events.json — parses/dumps the whole list in pydantic-core
+event_list_adapter = TypeAdapter(list[DrumEvent])
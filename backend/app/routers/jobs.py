@@ -1,11 +1,10 @@
 import asyncio
-import json
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
-from app.models.cluster import ClusterInfo, ClustersResponse, ClusterUpdateRequest
-from app.models.drum_event import DrumEvent
+from app.models.cluster import ClustersResponse, ClusterUpdateRequest, cluster_list_adapter
+from app.models.drum_event import event_list_adapter
 from app.models.job import JobResponse, RerunRequest
 from app.services.drum_clusterer import relabel_and_regenerate
 from app.services.midi_writer import write_midi
@@ -139,7 +138,9 @@ async def get_events(job_id: str):
     if not events_path.exists():
         raise HTTPException(status_code=404, detail="Events not ready")
 
-    return json.loads(events_path.read_text())
+    # events.json is already the response body — send it as-is, read in one go so
+    # the body and Content-Length always come from the same version of the file
+    return Response(content=events_path.read_bytes(), media_type="application/json")
 
 
 @router.get("/{job_id}/clusters", response_model=ClustersResponse)
@@ -157,13 +158,11 @@ async def get_clusters(job_id: str):
     if not events_path.exists():
         raise HTTPException(status_code=404, detail="Events not ready")
 
-    clusters_data = json.loads(clusters_path.read_text())
-    events_data = json.loads(events_path.read_text())
-
-    return ClustersResponse(
-        clusters=[ClusterInfo(**c) for c in clusters_data],
-        events=events_data,
+    # Splice the stored JSON arrays into the response body without re-parsing them
+    body = b"".join(
+        [b'{"clusters":', clusters_path.read_bytes(), b',"events":', events_path.read_bytes(), b"}"]
     )
+    return Response(content=body, media_type="application/json")
 
 
 @router.put("/{job_id}/clusters", response_model=ClustersResponse)
@@ -179,19 +178,16 @@ async def update_clusters(job_id: str, req: ClusterUpdateRequest):
         raise HTTPException(status_code=404, detail="Clusters/events not ready")
 
     # Load current data
-    clusters = [ClusterInfo(**c) for c in json.loads(clusters_path.read_text())]
-    events = [DrumEvent(**e) for e in json.loads(events_path.read_text())]
+    clusters = cluster_list_adapter.validate_json(clusters_path.read_bytes())
+    events = event_list_adapter.validate_json(events_path.read_bytes())
 
     # Re-label and regenerate
     events, clusters = relabel_and_regenerate(events, clusters, req.cluster_labels, job.bpm)
 
-    # Save updated events
-    events_data = [e.model_dump() for e in events]
-    events_path.write_text(json.dumps(events_data, indent=2))
-
-    # Save updated clusters
-    clusters_data = [c.model_dump() for c in clusters]
-    clusters_path.write_text(json.dumps(clusters_data, indent=2))
+    # Save updated events and clusters
+    file_manager.write_atomic(events_path, event_list_adapter.dump_json(events))
+    file_manager.write_atomic(clusters_path, cluster_list_adapter.dump_json(clusters))
+    events_data = event_list_adapter.dump_python(events)
 
     # Regenerate MIDI
     midi_path = file_manager.midi_path(job_id)
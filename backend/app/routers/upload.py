@@ -1,7 +1,10 @@
 import asyncio
-import hashlib
+import os
+import shutil
 import uuid
 from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO
 
 from fastapi import APIRouter, File, Form, UploadFile
 
@@ -15,6 +18,30 @@ router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 # Hold references to background tasks so they aren't garbage-collected
 _background_tasks: set[asyncio.Task] = set()
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _save_upload(src: BinaryIO, dest: Path) -> None:
+    """Copy an upload's spooled file to dest.
+
+    Once the spool has rolled over to a temp file on disk, the copy is done by the
+    kernel with sendfile(2); small in-memory uploads are copied in chunks.
+    """
+    src.seek(0)
+    with dest.open("wb") as out:
+        if getattr(src, "_rolled", False) and hasattr(os, "sendfile"):
+            src_fd = src.fileno()
+            size = os.fstat(src_fd).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+
 
 @router.post("/upload", response_model=JobResponse)
 async def upload_file(
@@ -34,12 +61,10 @@ async def upload_file(
     )
     job_store.create(job)
 
-    # Save uploaded file and compute hash for dedup
+    # Stream uploaded file to disk (the pipeline hashes it for dedup)
+    file_manager.ensure_job_dir(job_id)
     original_path = file_manager.original_path(job_id)
-    original_path.parent.mkdir(parents=True, exist_ok=True)
-    content = await file.read()
-    original_path.write_bytes(content)
-    job.audio_hash = hashlib.sha256(content).hexdigest()
+    await asyncio.to_thread(_save_upload, file.file, original_path)
 
     # Start pipeline in background
     task = asyncio.create_task(run_pipeline(job_id))
@@ -65,7 +90,7 @@ async def youtube_upload(request: YouTubeRequest):
     job_store.create(job)
 
     # Ensure job directory exists
-    file_manager.job_dir(job_id)
+    file_manager.ensure_job_dir(job_id)
 
     # Start pipeline in background
     task = asyncio.create_task(run_pipeline(job_id))
@@ -0,0 +1,19 @@
+import logging
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def decode_audio(audio_path: Path) -> tuple[np.ndarray, int]:
+    """Decode an audio file once at its native sample rate.
+
+    Returns float32 samples shaped (channels, samples) and the sample rate, so
+    stages that need different rates can resample the same buffer in memory.
+    """
+    y, sr = librosa.load(audio_path, sr=None, mono=False)
+    y = np.atleast_2d(y)
+    logger.info(f"Decoded {audio_path.name}: {y.shape[0]} ch, {y.shape[1]} samples @ {sr} Hz")
+    return y, sr
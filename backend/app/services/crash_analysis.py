@@ -120,66 +120,58 @@ def _process_riding_crash(
             for e in crash_events
         ]
 
-    # Build 8th-note grid per bar
-    bar_slot_hits: dict[int, dict[int, list[int]]] = {}
-    for e in crash_events:
-        bar_idx = min(int(e.time / bar_dur), num_bars - 1)
-        time_in_bar = e.time - bar_idx * bar_dur
-        slot = round(time_in_bar / eighth_dur) % slots_per_bar
-        bar_slot_hits.setdefault(bar_idx, {}).setdefault(slot, []).append(e.velocity)
-
-    # Majority vote
-    slot_bar_count: dict[int, int] = {}
-    for bar_idx in range(num_bars):
-        for slot in bar_slot_hits.get(bar_idx, {}):
-            slot_bar_count[slot] = slot_bar_count.get(slot, 0) + 1
-
-    dominant_slots = {slot for slot, count in slot_bar_count.items() if count / num_bars >= 0.50}
-
-    all_velocities = [e.velocity for e in crash_events]
-    median_velocity = int(np.median(all_velocities))
-
-    corrected: list[DrumEvent] = []
-    for bar_idx in range(num_bars):
-        bar_start = bar_idx * bar_dur
-        bar_data = bar_slot_hits.get(bar_idx, {})
-
-        for slot in range(slots_per_bar):
-            slot_time = bar_start + slot * eighth_dur
-            if slot_time > duration:
-                break
-
-            is_dominant = slot in dominant_slots
-            has_detection = slot in bar_data
-
-            if is_dominant:
-                vel = int(np.mean(bar_data[slot])) if has_detection else median_velocity
-                conf = 0.90 if has_detection else 0.65
-                corrected.append(
-                    DrumEvent(
-                        time=round(slot_time, 4),
-                        quantized_time=round(slot_time, 4),
-                        drum_type="ride",
-                        midi_note=ride_note,
-                        velocity=vel,
-                        confidence=conf,
-                        cluster_id=crash_events[0].cluster_id,
-                    )
-                )
-            elif has_detection:
-                vel = int(np.mean(bar_data[slot]))
-                if vel > 1.3 * median_velocity:
-                    corrected.append(
-                        DrumEvent(
-                            time=round(slot_time, 4),
-                            quantized_time=round(slot_time, 4),
-                            drum_type="ride",
-                            midi_note=ride_note,
-                            velocity=vel,
-                            confidence=0.70,
-                            cluster_id=crash_events[0].cluster_id,
-                        )
-                    )
+    # Build 8th-note grid per bar: hit count and velocity sum per (bar, slot)
+    times = np.fromiter((e.time for e in crash_events), dtype=np.float64, count=len(crash_events))
+    velocities = np.fromiter(
+        (e.velocity for e in crash_events), dtype=np.int64, count=len(crash_events)
+    )
+    bar_idx = np.minimum((times / bar_dur).astype(np.int64), num_bars - 1)
+    slot_idx = np.round((times - bar_idx * bar_dur) / eighth_dur).astype(np.int64) % slots_per_bar
+    cell = bar_idx * slots_per_bar + slot_idx
+    grid_size = num_bars * slots_per_bar
+    hit_count = np.bincount(cell, minlength=grid_size).reshape(num_bars, slots_per_bar)
+    vel_sum = np.bincount(cell, weights=velocities, minlength=grid_size).reshape(
+        num_bars, slots_per_bar
+    )
+
+    # Majority vote: a slot is dominant if it has hits in at least half the bars
+    slot_bar_count = (hit_count > 0).sum(axis=0)
+    dominant = slot_bar_count / num_bars >= 0.50
+
+    median_velocity = int(np.median(velocities))
+
+    # Emit from masks over the grid: every dominant slot (filled in if empty),
+    # plus off-pattern slots with a clearly louder hit. Slots past the end are dropped
+    slot_times = np.arange(num_bars)[:, None] * bar_dur + np.arange(slots_per_bar) * eighth_dur
+    in_song = slot_times <= duration
+    has_detection = hit_count > 0
+    mean_vel = (vel_sum / np.maximum(hit_count, 1)).astype(np.int64)
+
+    is_dominant = dominant & in_song
+    is_loud = has_detection & ~dominant & in_song & (mean_vel > 1.3 * median_velocity)
+    keep = is_dominant | is_loud
+
+    velocity = np.where(has_detection, mean_vel, median_velocity)
+    confidence = np.where(is_dominant, np.where(has_detection, 0.90, 0.65), 0.70)
+
+    cluster_id = crash_events[0].cluster_id
+    corrected = [
+        DrumEvent(
+            time=round(t, 4),
+            quantized_time=round(t, 4),
+            drum_type="ride",
+            midi_note=ride_note,
+            velocity=v,
+            confidence=c,
+            cluster_id=cluster_id,
+        )
+        for t, v, c in zip(
+            slot_times[keep].tolist(),
+            velocity[keep].tolist(),
+            confidence[keep].tolist(),
+            strict=True,
+        )
+    ]
 
     logger.info(f"Ride pattern: {len(crash_events)} raw → {len(corrected)} corrected")
     return corrected
@@ -196,15 +188,35 @@ def _process_accent_crash(
     Applies sustain suppression after kept crashes.
     """
     beat_dur = 60.0 / bpm
-    kick_times = sorted(e.time for e in kick_events)
+    kick_times = np.sort([e.time for e in kick_events])
 
     # Sort crash events by time
     sorted_crashes = sorted(crash_events, key=lambda e: e.time)
 
+    # Score every crash up front on velocity, kick coincidence, and strong beat position
+    crash_times = np.array([e.time for e in sorted_crashes])
+    velocities = np.array([e.velocity for e in sorted_crashes])
+    has_kick = _has_nearby_event(crash_times, kick_times, KICK_COINCIDENCE_WINDOW)
+
+    # Strong beat position (beat 1 or 3)
+    beat_position = (crash_times % (beat_dur * 4)) / beat_dur
+    tolerance = STRONG_BEAT_TOLERANCE
+    on_strong_beat = (
+        (beat_position < tolerance)
+        | (np.abs(beat_position - 2) < tolerance)
+        | (np.abs(beat_position - 4) < tolerance)
+    )
+
+    scores = (
+        (velocities >= ACCENT_VELOCITY_THRESHOLD) * ACCENT_WEIGHT_VELOCITY
+        + has_kick * ACCENT_WEIGHT_KICK
+        + on_strong_beat * ACCENT_WEIGHT_STRONG_BEAT
+    )
+
     kept: list[DrumEvent] = []
     suppress_until = -1.0
 
-    for e in sorted_crashes:
+    for e, score in zip(sorted_crashes, scores.tolist(), strict=True):
         # Check if we're in sustain suppression window
         if e.time < suppress_until:
             # Only override if much louder than the crash that started suppression
@@ -213,29 +225,6 @@ def _process_accent_crash(
             else:
                 continue
 
-        # Score this event
-        score = 0.0
-
-        # a. Strong attack velocity
-        if e.velocity >= ACCENT_VELOCITY_THRESHOLD:
-            score += ACCENT_WEIGHT_VELOCITY
-
-        # b. Kick coincidence
-        has_kick = _has_nearby_event(e.time, kick_times, KICK_COINCIDENCE_WINDOW)
-        if has_kick:
-            score += ACCENT_WEIGHT_KICK
-
-        # c. Strong beat position (beat 1 or 3)
-        beat_position = (e.time % (beat_dur * 4)) / beat_dur
-        tolerance = STRONG_BEAT_TOLERANCE
-        on_strong_beat = (
-            beat_position < tolerance
-            or abs(beat_position - 2) < tolerance
-            or abs(beat_position - 4) < tolerance
-        )
-        if on_strong_beat:
-            score += ACCENT_WEIGHT_STRONG_BEAT
-
         if score >= ACCENT_MIN_SCORE:
             kept.append(
                 DrumEvent(
@@ -255,16 +244,16 @@ def _process_accent_crash(
     return kept
 
 
-def _has_nearby_event(time: float, sorted_times: list[float], window: float) -> bool:
-    """Check if any event in sorted_times is within ±window of time."""
-    # Binary search for efficiency
-    lo, hi = 0, len(sorted_times) - 1
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        if abs(sorted_times[mid] - time) <= window:
-            return True
-        if sorted_times[mid] < time:
-            lo = mid + 1
-        else:
-            hi = mid - 1
-    return False
+def _has_nearby_event(times: np.ndarray, sorted_times: np.ndarray, window: float) -> np.ndarray:
+    """Check, for each of times, if any event in sorted_times is within ±window.
+
+    Only the two neighbors around each insertion point can be the closest
+    event, so one searchsorted call replaces a per-event search.
+    """
+    if len(sorted_times) == 0:
+        return np.zeros(len(times), dtype=bool)
+    idx = np.searchsorted(sorted_times, times)
+    last = len(sorted_times) - 1
+    before = sorted_times[np.clip(idx - 1, 0, last)]
+    after = sorted_times[np.clip(idx, 0, last)]
+    return (np.abs(before - times) <= window) | (np.abs(after - times) <= window)
@@ -1,78 +1,122 @@
 import logging
+import threading
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
 import torch
 
 logger = logging.getLogger(__name__)
 
-# Cache the model across calls
+# Cache the model across calls; the lock keeps startup preload and a first job
+# from loading it twice
 _model = None
+_model_lock = threading.Lock()
 
 
 def _get_model():
     global _model
-    if _model is None:
-        from demucs.pretrained import get_model
-
-        logger.info("Loading htdemucs model (first call, may download weights)...")
-        _model = get_model("htdemucs")
-        _model.eval()
-        if torch.cuda.is_available():
-            _model.cuda()
+    with _model_lock:
+        if _model is None:
+            from demucs.pretrained import get_model
+
+            logger.info("Loading htdemucs model (first call, may download weights)...")
+            model = get_model("htdemucs")
+            model.eval()
+            if torch.cuda.is_available():
+                model.cuda()
+            _model = model
     return _model
 
 
-def separate(input_path: Path, drum_path: Path, other_path: Path) -> None:
+def separate(
+    input_path: Path,
+    drum_path: Path,
+    other_path: Path,
+    audio: np.ndarray | None = None,
+    sr: int | None = None,
+) -> None:
     """Separate audio into drums and other stems using Demucs htdemucs model.
 
     The htdemucs model outputs 4 sources: drums, bass, other, vocals.
     We save the drums stem and mix the remaining 3 into the 'other' track.
+    Already-decoded (channels, samples) audio and its sample rate can be passed
+    to skip decoding input_path again.
     """
     from demucs.apply import apply_model
-    from demucs.audio import AudioFile
+    from demucs.audio import AudioFile, convert_audio
 
     model = _get_model()
     device = next(model.parameters()).device
 
     # Load audio
-    logger.info(f"Loading audio from {input_path}")
-    audio = AudioFile(input_path).read(
-        streams=0, samplerate=model.samplerate, channels=model.audio_channels
-    )
+    if audio is None:
+        logger.info(f"Loading audio from {input_path}")
+        audio = AudioFile(input_path).read(
+            streams=0, samplerate=model.samplerate, channels=model.audio_channels
+        )
+    else:
+        audio = convert_audio(torch.from_numpy(audio), sr, model.samplerate, model.audio_channels)
     # audio shape: (channels, samples)
 
+    # Normalize with scalar stats; one new tensor (audio may alias the caller's buffer),
+    # then divide in place
     ref = audio.mean(0)
-    audio = (audio - ref.mean()) / ref.std()
+    mu, sigma = ref.mean().item(), ref.std().item()
+    audio = (audio - mu).div_(sigma)
 
     # Run model — expects (batch, channels, samples)
-    audio_tensor = audio.unsqueeze(0).to(device)
-
+    use_cuda = device.type == "cuda"
+    audio_tensor = audio.unsqueeze(0)
+    if use_cuda:
+        # Page-locked memory lets the host-to-device copy run asynchronously
+        audio_tensor = audio_tensor.pin_memory()
+    audio_tensor = audio_tensor.to(device, non_blocking=use_cuda)
+
+    # BF16 autocast on GPU roughly halves activation memory and runs the matmuls on
+    # tensor cores; CPUs without native BF16 would only get slower, so stay in FP32 there
     logger.info("Running Demucs separation...")
-    with torch.no_grad():
+    with (
+        torch.no_grad(),
+        torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_cuda),
+    ):
         sources = apply_model(model, audio_tensor, progress=False)
     # sources shape: (batch, num_sources, channels, samples)
-    sources = sources[0]  # remove batch dim
+    sources = sources[0].float()  # remove batch dim, back to FP32 for denormalization
 
     # Undo normalization
-    sources = sources * ref.std() + ref.mean()
+    sources.mul_(sigma).add_(mu)
 
     # Map source names to indices
     source_names = model.sources  # e.g. ['drums', 'bass', 'other', 'vocals']
     source_map = {name: i for i, name in enumerate(source_names)}
     logger.info(f"Demucs sources: {source_names}")
 
-    # Extract drums
-    drums = sources[source_map["drums"]].cpu().numpy()
-
-    # Mix everything else (bass + other + vocals) into the backing track
-    other_indices = [i for name, i in source_map.items() if name != "drums"]
-    other_mix = sum(sources[i] for i in other_indices).cpu().numpy()
+    # Drums, and everything else (bass + other + vocals) mixed into the backing track.
+    # The mix is one reduction on device
+    drums_t = sources[source_map["drums"]]
+    other_t = sources.sum(dim=0) - drums_t
+
+    if use_cuda:
+        # Copy both stems into pinned memory asynchronously; the drum stem is
+        # written to disk while the backing mix is still being copied
+        host = torch.empty((2, *drums_t.shape), dtype=drums_t.dtype, pin_memory=True)
+        host[0].copy_(drums_t, non_blocking=True)
+        drums_copied = torch.cuda.Event()
+        drums_copied.record()
+        host[1].copy_(other_t, non_blocking=True)
+        drums_copied.synchronize()
+        drums, other_mix = host.numpy()
+    else:
+        drums, other_mix = drums_t.numpy(), other_t.numpy()
 
     # Save as WAV files
     logger.info(f"Saving drum stem to {drum_path}")
     sf.write(str(drum_path), drums.T, model.samplerate)
 
+    if use_cuda:
+        torch.cuda.current_stream().synchronize()
+
     logger.info(f"Saving other stem to {other_path}")
     sf.write(str(other_path), other_mix.T, model.samplerate)
 
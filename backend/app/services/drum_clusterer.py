@@ -6,15 +6,16 @@ Post-processing applies hi-hat pattern inference and crash accent/ride analysis.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
 
-from app.ml.drum_map import DRUM_MAP, DRUM_TYPE_MIN_GAP_MS
+from app.ml.drum_map import DEFAULT_MIN_GAP_S, DRUM_MAP, DRUM_TYPE_MIN_GAP_S
 from app.models.cluster import ClusterInfo
 from app.models.drum_event import DrumEvent
 from app.services.crash_analysis import analyze_crash_events
-from app.services.drumsep import separate_drums
 from app.services.hihat_pattern import infer_hihat_pattern
 from app.services.peak_detection import detect_peaks
 
@@ -35,11 +36,10 @@ def _get_audio_duration(audio_path: Path) -> float:
     return sf.info(str(audio_path)).duration
 
 
-def quantize_time(time_sec: float, bpm: float) -> float:
-    """Snap time to nearest 16th note grid position."""
+def quantize_time(time_sec: np.ndarray, bpm: float) -> np.ndarray:
+    """Snap times to nearest 16th note grid position."""
     sixteenth_duration = 60.0 / bpm / 4.0
-    grid_position = round(time_sec / sixteenth_duration)
-    return grid_position * sixteenth_duration
+    return np.rint(time_sec / sixteenth_duration) * sixteenth_duration
 
 
 def run_drum_separation(drum_audio_path: Path) -> dict[str, Path]:
@@ -47,6 +47,10 @@ def run_drum_separation(drum_audio_path: Path) -> dict[str, Path]:
 
     Returns dict mapping stem name to WAV path.
     """
+    # DrumSep pulls in torch; imported here so processes that only run onset
+    # detection (the pipeline's CPU workers, the evaluator) never load it
+    from app.services.drumsep import separate_drums
+
     output_dir = drum_audio_path.parent / "stems"
     logger.info(f"Separating drum track into stems -> {output_dir}")
     return separate_drums(drum_audio_path, output_dir)
@@ -67,14 +71,24 @@ def detect_onsets_from_stems(
     clusters: list[ClusterInfo] = []
     stem_events_map: dict[str, list[DrumEvent]] = {}
 
-    for stem_name, (drum_type, midi_note, cluster_id) in STEM_MAPPING.items():
-        stem_path = stem_paths.get(stem_name)
-        if stem_path is None or not stem_path.exists():
+    available: dict[str, Path] = {}
+    for stem_name, stem_path in stem_paths.items():
+        if not stem_path.exists():
             logger.warning(f"Stem '{stem_name}' not found, skipping")
             continue
-
-        # Detect peaks in this stem
-        peaks = detect_peaks(stem_path, bpm, stem_name=stem_name)
+        available[stem_name] = stem_path
+
+    # Detect peaks in every stem concurrently; the decode and NumPy work
+    # release the GIL, so the stems overlap even within one process
+    with ThreadPoolExecutor(max_workers=max(len(available), 1)) as pool:
+        futures = {
+            stem_name: pool.submit(detect_peaks, stem_path, bpm, stem_name=stem_name)
+            for stem_name, stem_path in available.items()
+        }
+        stem_peaks = {stem_name: future.result() for stem_name, future in futures.items()}
+
+    for stem_name, peaks in stem_peaks.items():
+        drum_type, midi_note, cluster_id = STEM_MAPPING[stem_name]
         logger.info(f"Stem '{stem_name}': {len(peaks)} peaks detected")
 
         if not peaks:
@@ -183,36 +197,36 @@ def deduplicate_events(events: list[DrumEvent]) -> list[DrumEvent]:
     if not events:
         return events
 
-    # Group by cluster_id
-    by_cluster: dict[int, list[DrumEvent]] = {}
-    for e in events:
-        by_cluster.setdefault(e.cluster_id, []).append(e)
-
-    kept: list[DrumEvent] = []
-    for _cid, cluster_events in by_cluster.items():
-        cluster_events.sort(key=lambda e: e.time)
-        drum_type = cluster_events[0].drum_type
-        min_gap_s = DRUM_TYPE_MIN_GAP_MS.get(drum_type, 40) / 1000.0
-
-        last_kept = cluster_events[0]
-        result = [last_kept]
-
-        for e in cluster_events[1:]:
-            gap = e.time - last_kept.time
-            if gap >= min_gap_s:
-                result.append(e)
-                last_kept = e
-            else:
-                # Merge: keep the higher-velocity event
-                if e.velocity > last_kept.velocity:
-                    result[-1] = e
-                    last_kept = e
-
-        kept.extend(result)
-
-    # Sort all events by time
-    kept.sort(key=lambda e: e.time)
-    return kept
+    times = [e.time for e in events]
+    velocities = [e.velocity for e in events]
+    cluster_ids = [e.cluster_id for e in events]
+
+    # One stable sort by (cluster, time) instead of grouping and sorting each cluster
+    order = np.lexsort((times, cluster_ids)).tolist()
+
+    kept: list[int] = []
+    last = -1  # index of the last kept event in the current cluster
+    min_gap_s = 0.0
+    for i in order:
+        if last < 0 or cluster_ids[i] != cluster_ids[last]:
+            # First event of a cluster: its type sets the cluster's min gap
+            min_gap_s = DRUM_TYPE_MIN_GAP_S.get(events[i].drum_type, DEFAULT_MIN_GAP_S)
+            kept.append(i)
+            last = i
+        elif times[i] - times[last] >= min_gap_s:
+            kept.append(i)
+            last = i
+        elif velocities[i] > velocities[last]:
+            # Merge: keep the higher-velocity event
+            kept[-1] = i
+            last = i
+
+    # Sort all events by time; simultaneous events stay in cluster first-seen order
+    first_seen: dict[int, int] = {}
+    for i, cid in enumerate(cluster_ids):
+        first_seen.setdefault(cid, i)
+    kept.sort(key=lambda i: (times[i], first_seen[cluster_ids[i]]))
+    return [events[i] for i in kept]
 
 
 def relabel_and_regenerate(
@@ -242,26 +256,30 @@ def relabel_and_regenerate(
     # Re-deduplicate with new type-specific gaps
     events = deduplicate_events(events)
 
-    # Re-quantize
-    for e in events:
-        e.quantized_time = round(quantize_time(e.time, bpm), 4)
+    # Re-quantize all events in one pass
+    times = np.fromiter((e.time for e in events), dtype=np.float64, count=len(events))
+    for e, quantized_time in zip(events, quantize_time(times, bpm).tolist(), strict=True):
+        e.quantized_time = round(quantized_time, 4)
 
     return events, clusters
 
 
 def _recompute_cluster_stats(events: list[DrumEvent], clusters: list[ClusterInfo]) -> None:
     """Update cluster event_count, mean_velocity, representative_time after dedup."""
-    event_by_cluster: dict[int, list[DrumEvent]] = {}
-    for e in events:
-        event_by_cluster.setdefault(e.cluster_id, []).append(e)
-
-    for c in clusters:
-        cevents = event_by_cluster.get(c.id, [])
-        c.event_count = len(cevents)
-        if cevents:
-            c.mean_velocity = round(sum(e.velocity for e in cevents) / len(cevents), 1)
-            times = sorted(e.time for e in cevents)
-            c.representative_time = round(times[len(times) // 2], 3)
+    times = np.fromiter((e.time for e in events), dtype=np.float64, count=len(events))
+    velocities = np.fromiter((e.velocity for e in events), dtype=np.int64, count=len(events))
+    cluster_ids = np.fromiter((e.cluster_id for e in events), dtype=np.int64, count=len(events))
+
+    # Sort by (cluster, time) once; each cluster is then a contiguous, time-ordered run
+    order = np.lexsort((times, cluster_ids))
+    bounds = np.searchsorted(cluster_ids[order], [[c.id, c.id + 1] for c in clusters])
+
+    for c, (lo, hi) in zip(clusters, bounds.tolist(), strict=True):
+        count = hi - lo
+        c.event_count = count
+        if count:
+            c.mean_velocity = round(int(velocities[order[lo:hi]].sum()) / count, 1)
+            c.representative_time = round(float(times[order[lo + count // 2]]), 3)
         else:
             c.mean_velocity = 0
             c.representative_time = 0.0
@@ -8,6 +8,8 @@ with the model class embedded locally — no MSST package dependency.
 """
 
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
@@ -18,6 +20,7 @@ import torch.nn as nn
 import yaml
 from ml_collections import ConfigDict
 
+from app.config import settings
 from app.ml.mdx23c import TFC_TDF_net
 
 logger = logging.getLogger(__name__)
@@ -27,12 +30,16 @@ CONFIG_URL = "https://github.com/jarredou/models/releases/download/DrumSep/confi
 CKPT_URL = "https://github.com/jarredou/models/releases/download/DrumSep/drumsep_5stems_mdx23c_jarredou.ckpt"
 CONFIG_PATH = MODEL_DIR / "config_mdx23c.yaml"
 CKPT_PATH = MODEL_DIR / "drumsep_5stems_mdx23c_jarredou.ckpt"
+# Bare state_dict extracted from the checkpoint on first load: loads with
+# weights_only=True and can be memory-mapped instead of unpickled
+STATE_PATH = MODEL_DIR / "drumsep_5stems_mdx23c_state.pt"
 
 STEM_NAMES = ["kick", "snare", "toms", "hh", "cymbals"]
 
 # Cached model
 _model = None
 _config = None
+_model_lock = threading.Lock()
 
 
 def download_model_files() -> None:
@@ -56,37 +63,57 @@ def _get_model():
     """Load the MDX23C model from config + checkpoint (cached globally)."""
     global _model, _config
 
-    if _model is not None:
+    # Serialized so a startup preload and a first job don't load it twice
+    with _model_lock:
+        if _model is not None:
+            return _model, _config
+
+        download_model_files()
+
+        # Load config as ConfigDict (dotted-attribute access, same as MSST)
+        with open(CONFIG_PATH) as f:
+            config = ConfigDict(yaml.load(f, Loader=yaml.FullLoader))
+        _config = config
+
+        # Build model from config
+        model = TFC_TDF_net(config)
+
+        if STATE_PATH.exists():
+            logger.info("Loading DrumSep weights...")
+            checkpoint = torch.load(STATE_PATH, map_location="cpu", weights_only=True, mmap=True)
+        else:
+            # Load checkpoint — unwrap state_dict if wrapped
+            logger.info("Loading DrumSep checkpoint...")
+            checkpoint = torch.load(CKPT_PATH, map_location="cpu", weights_only=False)
+            if "state" in checkpoint:
+                checkpoint = checkpoint["state"]
+            if "state_dict" in checkpoint:
+                checkpoint = checkpoint["state_dict"]
+            if "model_state_dict" in checkpoint:
+                checkpoint = checkpoint["model_state_dict"]
+            _save_state_dict(checkpoint, STATE_PATH)
+        model.load_state_dict(checkpoint)
+        model.eval()
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = model.to(device)
+        logger.info(f"DrumSep model loaded on {device}")
+
+        if settings.compile_models and device == "cuda":
+            # Inductor fuses the conv/norm/activation chains; chunk shapes are fixed, so
+            # only the first batch (and a short final batch) pay for compilation
+            logger.info("Compiling DrumSep model with torch.compile")
+            model = torch.compile(model, dynamic=False)
+
+        _model = model
         return _model, _config
 
-    download_model_files()
 
-    # Load config as ConfigDict (dotted-attribute access, same as MSST)
-    with open(CONFIG_PATH) as f:
-        config = ConfigDict(yaml.load(f, Loader=yaml.FullLoader))
-    _config = config
-
-    # Build model from config
-    model = TFC_TDF_net(config)
-
-    # Load checkpoint — unwrap state_dict if wrapped
-    logger.info("Loading DrumSep checkpoint...")
-    checkpoint = torch.load(CKPT_PATH, map_location="cpu", weights_only=False)
-    if "state" in checkpoint:
-        checkpoint = checkpoint["state"]
-    if "state_dict" in checkpoint:
-        checkpoint = checkpoint["state_dict"]
-    if "model_state_dict" in checkpoint:
-        checkpoint = checkpoint["model_state_dict"]
-    model.load_state_dict(checkpoint)
-    model.eval()
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = model.to(device)
-    logger.info(f"DrumSep model loaded on {device}")
-
-    _model = model
-    return _model, _config
+def _save_state_dict(state_dict: dict, path: Path) -> None:
+    """Write a state_dict next to the checkpoint, atomically (a partial file would be loaded)."""
+    tmp_path = path.with_suffix(".tmp")
+    torch.save(state_dict, tmp_path)
+    tmp_path.replace(path)
 
 
 def separate_drums(drum_path: Path, output_dir: Path) -> dict[str, Path]:
@@ -99,22 +126,20 @@ def separate_drums(drum_path: Path, output_dir: Path) -> dict[str, Path]:
 
     # Load audio
     logger.info(f"Loading drum audio for DrumSep: {drum_path}")
-    audio, sr = sf.read(str(drum_path), dtype="float32")
-    if audio.ndim == 1:
-        audio = np.stack([audio, audio], axis=-1)  # mono -> stereo
-    # audio shape: (samples, channels)
+    audio, sr = sf.read(str(drum_path), dtype="float32", always_2d=True)
+    # audio shape: (samples, channels); demix expects (channels, samples)
+    mix = audio.T
 
     target_sr = config.audio.get("sample_rate", 44100)
     if sr != target_sr:
         import librosa
 
-        audio_left = librosa.resample(audio[:, 0], orig_sr=sr, target_sr=target_sr)
-        audio_right = librosa.resample(audio[:, 1], orig_sr=sr, target_sr=target_sr)
-        audio = np.stack([audio_left, audio_right], axis=-1)
+        # One multichannel resample call (soxr handles all channels in a single pass)
+        mix = librosa.resample(mix, orig_sr=sr, target_sr=target_sr)
         sr = target_sr
 
-    # Convert to tensor: (channels, samples) — what demix expects
-    mix = audio.T  # (channels, samples)
+    if mix.shape[0] == 1:
+        mix = np.broadcast_to(mix, (2, mix.shape[1]))  # mono -> stereo view, no copy
 
     # Determine instruments from config
     if getattr(config.training, "target_instrument", None):
@@ -141,14 +166,18 @@ def separate_drums(drum_path: Path, output_dir: Path) -> dict[str, Path]:
     return stem_paths
 
 
-def _get_windowing_array(window_size: int, fade_size: int) -> torch.Tensor:
-    """Create a fade-in/fade-out window for overlap-add blending."""
+@lru_cache(maxsize=4)
+def _get_windowing_array(window_size: int, fade_size: int, device: torch.device) -> torch.Tensor:
+    """Create a fade-in/fade-out window for overlap-add blending.
+
+    Cached per device and shared across calls — clone before modifying.
+    """
     fadein = torch.linspace(0, 1, fade_size)
     fadeout = torch.linspace(1, 0, fade_size)
     window = torch.ones(window_size)
     window[:fade_size] = fadein
     window[-fade_size:] = fadeout
-    return window
+    return window.to(device)
 
 
 def _demix(
@@ -190,61 +219,80 @@ def _demix(
     step = chunk_size // num_overlap
     border = chunk_size - step
     length_init = mix.shape[-1]
-    windowing_array = _get_windowing_array(chunk_size, fade_size)
+    windowing_array = _get_windowing_array(chunk_size, fade_size, torch.device(device))
 
     # Reflect-pad edges to avoid border artifacts
     if length_init > 2 * border and border > 0:
         mix = nn.functional.pad(mix, (border, border), mode="reflect")
 
+    # separate_drums passes a torch.device, which never equals the string "cpu"
+    use_cuda = torch.device(device).type == "cuda"
+    if use_cuda:
+        # Page-locked source lets each chunk's host-to-device copy run asynchronously
+        mix = mix.pin_memory()
+
     use_amp = getattr(config.training, "use_amp", True)
 
-    with torch.amp.autocast("cuda", enabled=(use_amp and device != "cpu")):
+    with torch.amp.autocast("cuda", enabled=(use_amp and use_cuda)):
         with torch.inference_mode():
+            # Overlap-add stays on the device; the window weights are the same for every
+            # instrument and channel, so one weight per sample is enough
             req_shape = (num_instruments,) + mix.shape
-            result = torch.zeros(req_shape, dtype=torch.float32)
-            counter = torch.zeros(req_shape, dtype=torch.float32)
+            result = torch.zeros(req_shape, dtype=torch.float32, device=device)
+            counter = torch.zeros(mix.shape[-1], dtype=torch.float32, device=device)
+
+            # Chunks are copied straight into one preallocated batch buffer; only a
+            # short final chunk needs a padded temporary
+            batch = torch.empty(
+                (batch_size, mix.shape[0], chunk_size), dtype=torch.float32, device=device
+            )
 
             i = 0
-            batch_data = []
             batch_locations = []
 
             while i < mix.shape[1]:
-                part = mix[:, i : i + chunk_size].to(device)
+                part = mix[:, i : i + chunk_size]
                 chunk_len = part.shape[-1]
-                if chunk_len > chunk_size // 2:
-                    pad_mode = "reflect"
-                else:
-                    pad_mode = "constant"
-                part = nn.functional.pad(part, (0, chunk_size - chunk_len), mode=pad_mode, value=0)
-
-                batch_data.append(part)
+                if chunk_len < chunk_size:
+                    if chunk_len > chunk_size // 2:
+                        pad_mode = "reflect"
+                    else:
+                        pad_mode = "constant"
+                    part = nn.functional.pad(
+                        part, (0, chunk_size - chunk_len), mode=pad_mode, value=0
+                    )
+
+                batch[len(batch_locations)].copy_(part, non_blocking=use_cuda)
                 batch_locations.append((i, chunk_len))
                 i += step
 
                 # Process batch when full or at end
-                if len(batch_data) >= batch_size or i >= mix.shape[1]:
-                    arr = torch.stack(batch_data, dim=0)
-                    x = model(arr)
-
-                    window = windowing_array.clone()
-                    if batch_locations[0][0] == 0:  # first chunk, no fade-in
-                        window[:fade_size] = 1
-                    if i >= mix.shape[1]:  # last chunk, no fade-out
-                        window[-fade_size:] = 1
+                if len(batch_locations) >= batch_size or i >= mix.shape[1]:
+                    x = model(batch[: len(batch_locations)])
+
+                    # Only edge batches need a modified copy of the shared window
+                    window = windowing_array
+                    is_first = batch_locations[0][0] == 0
+                    is_last = i >= mix.shape[1]
+                    if is_first or is_last:
+                        window = windowing_array.clone()
+                        if is_first:  # first chunk, no fade-in
+                            window[:fade_size] = 1
+                        if is_last:  # last chunk, no fade-out
+                            window[-fade_size:] = 1
 
                     for j, (start, seg_len) in enumerate(batch_locations):
                         result[..., start : start + seg_len] += (
-                            x[j, ..., :seg_len].cpu() * window[..., :seg_len]
+                            x[j, ..., :seg_len] * window[..., :seg_len]
                         )
-                        counter[..., start : start + seg_len] += window[..., :seg_len]
+                        counter[start : start + seg_len] += window[..., :seg_len]
 
-                    batch_data.clear()
                     batch_locations.clear()
 
-            # Weighted average
-            estimated_sources = result / counter
-            estimated_sources = estimated_sources.cpu().numpy()
-            np.nan_to_num(estimated_sources, copy=False, nan=0.0)
+            # Weighted average in place, copied back to the host once. Samples only
+            # ever covered by zero window weight have result == 0, so clamping their
+            # counter gives 0 where the plain divide gave NaN
+            estimated_sources = result.div_(counter.clamp_(min=1e-8)).cpu().numpy()
 
             # Remove reflect padding
             if length_init > 2 * border and border > 0:
@@ -27,23 +27,29 @@ NON_DOMINANT_VELOCITY_MULT = 1.3
 CONFIDENCE_DETECTED = 0.95
 CONFIDENCE_FILLED = 0.70
 
+# A filled slot is anchored if a kick or snare lands within this many ms of it
+ANCHOR_WINDOW_MS = 30
+
 # 16 slots per bar (4 beats × 4 sixteenths)
 SLOTS_PER_BAR = 16
 
 
-def _classify_pattern(dominant_slots: set[int]) -> str:
-    """Classify the dominant hi-hat pattern type."""
-    if len(dominant_slots) <= 4:
-        return "sparse"
+# Slot sets of the known patterns as 16-bit masks (bit i = slot i)
+EVEN_SLOTS_MASK = sum(1 << slot for slot in (0, 2, 4, 6, 8, 10, 12, 14))
+SHUFFLE_SLOTS_MASK = sum(1 << slot for slot in (0, 3, 4, 7, 8, 11, 12, 15))
 
-    even_slots = {0, 2, 4, 6, 8, 10, 12, 14}
-    shuffle_slots = {0, 3, 4, 7, 8, 11, 12, 15}
+
+def _classify_pattern(dominant_mask: int) -> str:
+    """Classify the dominant hi-hat pattern type from its slot bitmask."""
+    num_dominant = dominant_mask.bit_count()
+    if num_dominant <= 4:
+        return "sparse"
 
     # Check how well the dominant slots match known patterns
-    even_match = len(dominant_slots & even_slots) / max(len(dominant_slots), 1)
-    shuffle_match = len(dominant_slots & shuffle_slots) / max(len(dominant_slots), 1)
+    even_match = (dominant_mask & EVEN_SLOTS_MASK).bit_count() / max(num_dominant, 1)
+    shuffle_match = (dominant_mask & SHUFFLE_SLOTS_MASK).bit_count() / max(num_dominant, 1)
 
-    if len(dominant_slots) >= 14:
+    if num_dominant >= 14:
         return "16ths"
     if shuffle_match > 0.8 and even_match < 0.7:
         return "shuffle"
@@ -89,32 +95,27 @@ def infer_hihat_pattern(
     if not hh_events:
         return hh_events
 
-    # Build a grid: for each bar, which 16th-note slots have hits?
-    # Also track velocity per (bar, slot)
-    bar_slot_hits: dict[int, dict[int, list[int]]] = {}  # bar -> slot -> [velocities]
-    for e in hh_events:
-        bar_idx = int(e.time / bar_dur)
-        if bar_idx >= num_bars:
-            bar_idx = num_bars - 1
-        time_in_bar = e.time - bar_idx * bar_dur
-        slot = round(time_in_bar / sixteenth_dur) % SLOTS_PER_BAR
-
-        bar_slot_hits.setdefault(bar_idx, {}).setdefault(slot, []).append(e.velocity)
-
-    # Majority vote: count how many bars each slot is active
-    slot_bar_count: dict[int, int] = {}
-    for bar_idx in range(num_bars):
-        bar_data = bar_slot_hits.get(bar_idx, {})
-        for slot in bar_data:
-            slot_bar_count[slot] = slot_bar_count.get(slot, 0) + 1
-
-    dominant_slots = {
-        slot for slot, count in slot_bar_count.items() if count / num_bars >= DOMINANCE_THRESHOLD
-    }
+    # Build a (bar, slot) grid of hit counts and velocity sums: each onset goes
+    # to its bar and the nearest 16th-note slot within it
+    times = np.fromiter((e.time for e in hh_events), dtype=np.float64, count=len(hh_events))
+    velocities = np.fromiter((e.velocity for e in hh_events), dtype=np.int64, count=len(hh_events))
+    bar_idx = np.minimum((times / bar_dur).astype(np.int64), num_bars - 1)
+    slot_idx = np.rint((times - bar_idx * bar_dur) / sixteenth_dur).astype(np.int64) % SLOTS_PER_BAR
+    cell = bar_idx * SLOTS_PER_BAR + slot_idx
+    grid_size = num_bars * SLOTS_PER_BAR
+    hit_count = np.bincount(cell, minlength=grid_size).reshape(num_bars, SLOTS_PER_BAR)
+    vel_sum = np.bincount(cell, weights=velocities, minlength=grid_size).reshape(
+        num_bars, SLOTS_PER_BAR
+    )
+    has_hits = hit_count > 0
+
+    # Majority vote: a slot is dominant if it is active in enough bars
+    dominant = has_hits.sum(axis=0) / num_bars >= DOMINANCE_THRESHOLD
+    dominant_mask = int(dominant @ (1 << np.arange(SLOTS_PER_BAR)))
 
-    pattern_type = _classify_pattern(dominant_slots)
+    pattern_type = _classify_pattern(dominant_mask)
     logger.info(
-        f"Hi-hat pattern: {pattern_type}, {len(dominant_slots)} dominant slots "
+        f"Hi-hat pattern: {pattern_type}, {dominant_mask.bit_count()} dominant slots "
         f"out of {SLOTS_PER_BAR}, {num_bars} bars"
     )
 
@@ -122,80 +123,89 @@ def infer_hihat_pattern(
         logger.info("Hi-hat: sparse pattern, returning raw detections")
         return hh_events
 
-    # Compute median velocity across all hits for gap-filling
-    all_velocities = [e.velocity for e in hh_events]
-    median_velocity = int(np.median(all_velocities))
-
-    # Build kick/snare time sets for anchoring (quantized to nearest ms)
-    kick_times_ms = {int(e.time * 1000) for e in kick_events}
-    snare_times_ms = {int(e.time * 1000) for e in snare_events}
+    # Median velocity across all hits for gap-filling, read off a counting
+    # histogram of the (small, non-negative) MIDI velocities: the middle order
+    # statistics are where the cumulative count first reaches their rank
+    n = len(velocities)
+    cumulative = np.cumsum(np.bincount(velocities, minlength=128))
+    lower, upper = np.searchsorted(cumulative, [(n - 1) // 2 + 1, n // 2 + 1]).tolist()
+    median_velocity = (lower + upper) // 2
+
+    # Per-millisecond mask of the kick/snare anchor neighbourhoods, marked with
+    # a difference array, so each filled slot is checked with a single lookup
+    anchor_ms = np.fromiter(
+        (int(e.time * 1000) for e in (*kick_events, *snare_events)), dtype=np.int64
+    )
+    mask_size = int(duration * 1000) + 1
+    starts = np.clip(anchor_ms - ANCHOR_WINDOW_MS, 0, mask_size)
+    ends = np.clip(anchor_ms + ANCHOR_WINDOW_MS + 1, 0, mask_size)
+    delta = np.bincount(starts, minlength=mask_size + 1) - np.bincount(
+        ends, minlength=mask_size + 1
+    )
+    near_anchor = np.cumsum(delta)[:mask_size] > 0
 
     # Template DrumEvent properties from first hh event
     template = hh_events[0]
+    template_fields = {
+        "drum_type": template.drum_type,
+        "midi_note": template.midi_note,
+        "cluster_id": template.cluster_id,
+    }
+
+    # Classify every (bar, slot) cell of the grid at once
+    slot_times = np.arange(num_bars)[:, None] * bar_dur + np.arange(SLOTS_PER_BAR) * sixteenth_dur
+    in_song = slot_times <= duration
+    is_dominant = dominant[None, :]
+
+    # Mean velocity of the detections in each cell (truncated, as MIDI velocities are ints)
+    mean_velocity = (vel_sum / np.maximum(hit_count, 1)).astype(np.int64)
+
+    # Dominant + detected → keep with high confidence
+    keep_detected = in_song & is_dominant & has_hits
+    # Dominant + missing → fill gap
+    fill_gap = in_song & is_dominant & ~has_hits
+    # Non-dominant + detected → keep only if loud enough
+    keep_loud = (
+        in_song
+        & ~is_dominant
+        & has_hits
+        & (mean_velocity > NON_DOMINANT_VELOCITY_MULT * median_velocity)
+    )
+    # Non-dominant + no detection → skip
+
+    # Boost a filled slot's confidence if kick/snare also hits there
+    slot_ms = np.minimum((slot_times * 1000).astype(np.int64), mask_size - 1)
+    has_anchor = near_anchor[slot_ms]
+
+    velocity = np.where(fill_gap, median_velocity, mean_velocity)
+    confidence = np.select(
+        [keep_detected, fill_gap & has_anchor, fill_gap, keep_loud],
+        [
+            CONFIDENCE_DETECTED,
+            round(min(CONFIDENCE_FILLED + 0.1, 1.0), 2),
+            round(min(CONFIDENCE_FILLED, 1.0), 2),
+            0.75,
+        ],
+    )
 
-    corrected: list[DrumEvent] = []
-
-    for bar_idx in range(num_bars):
-        bar_start = bar_idx * bar_dur
-        bar_data = bar_slot_hits.get(bar_idx, {})
-
-        for slot in range(SLOTS_PER_BAR):
-            slot_time = bar_start + slot * sixteenth_dur
-            if slot_time > duration:
-                break
-
-            is_dominant = slot in dominant_slots
-            has_detection = slot in bar_data
-
-            if is_dominant and has_detection:
-                # Dominant + detected → keep with high confidence
-                vel = int(np.mean(bar_data[slot]))
-                corrected.append(
-                    DrumEvent(
-                        time=round(slot_time, 4),
-                        quantized_time=round(slot_time, 4),
-                        drum_type=template.drum_type,
-                        midi_note=template.midi_note,
-                        velocity=vel,
-                        confidence=CONFIDENCE_DETECTED,
-                        cluster_id=template.cluster_id,
-                    )
-                )
-            elif is_dominant and not has_detection:
-                # Dominant + missing → fill gap
-                # Boost confidence if kick/snare also hits here
-                slot_time_ms = int(slot_time * 1000)
-                has_anchor = any(
-                    abs(slot_time_ms - t) <= 30 for t in kick_times_ms | snare_times_ms
-                )
-                conf = CONFIDENCE_FILLED + (0.1 if has_anchor else 0.0)
-                corrected.append(
-                    DrumEvent(
-                        time=round(slot_time, 4),
-                        quantized_time=round(slot_time, 4),
-                        drum_type=template.drum_type,
-                        midi_note=template.midi_note,
-                        velocity=median_velocity,
-                        confidence=round(min(conf, 1.0), 2),
-                        cluster_id=template.cluster_id,
-                    )
-                )
-            elif not is_dominant and has_detection:
-                # Non-dominant + detected → keep only if loud enough
-                vel = int(np.mean(bar_data[slot]))
-                if vel > NON_DOMINANT_VELOCITY_MULT * median_velocity:
-                    corrected.append(
-                        DrumEvent(
-                            time=round(slot_time, 4),
-                            quantized_time=round(slot_time, 4),
-                            drum_type=template.drum_type,
-                            midi_note=template.midi_note,
-                            velocity=vel,
-                            confidence=0.75,
-                            cluster_id=template.cluster_id,
-                        )
-                    )
-            # else: non-dominant + no detection → skip
+    # Emit the kept cells in (bar, slot) order. Every field is already a
+    # well-typed value, so skip pydantic validation when building the events
+    keep = keep_detected | fill_gap | keep_loud
+    corrected = [
+        DrumEvent.model_construct(
+            time=round(slot_time, 4),
+            quantized_time=round(slot_time, 4),
+            velocity=vel,
+            confidence=conf,
+            **template_fields,
+        )
+        for slot_time, vel, conf in zip(
+            slot_times[keep].tolist(),
+            velocity[keep].tolist(),
+            confidence[keep].tolist(),
+            strict=True,
+        )
+    ]
 
     logger.info(f"Hi-hat pattern correction: {len(hh_events)} raw → {len(corrected)} corrected")
     return corrected
@@ -1,32 +1,73 @@
 import logging
 from pathlib import Path
 
-import pretty_midi
+import mido
 
 from app.models.drum_event import DrumEvent
 
 logger = logging.getLogger(__name__)
 
+# Ticks per quarter note (pretty_midi's default, kept so output is unchanged)
+TICKS_PER_BEAT = 220
+
+# Channel 10 (0-indexed: 9) is the General MIDI drum channel
+DRUM_CHANNEL = 9
+
+NOTE_DURATION = 0.05  # Short duration for percussion hits
+
 
 def write_midi(events: list[DrumEvent], bpm: float, output_path: Path) -> Path:
-    """Generate a MIDI file from classified drum events."""
-    midi = pretty_midi.PrettyMIDI(initial_tempo=bpm)
+    """Generate a MIDI file from classified drum events.
 
-    # Channel 10 (0-indexed: 9) for drums — program is ignored for drum instruments
-    drum_inst = pretty_midi.Instrument(program=0, is_drum=True, name="Drums")
+    Writes a type 1 file with a tempo track and a single drum track, emitting the
+    note_on/note_off messages directly with mido.
+    """
+    seconds_per_tick = 60.0 / (bpm * TICKS_PER_BEAT)
 
-    note_duration = 0.05  # Short duration for percussion hits
+    def to_tick(time_sec: float) -> int:
+        return round(time_sec / seconds_per_tick) if time_sec > 0 else 0
 
+    # (absolute tick, note, velocity); a note_off is a note_on with velocity 0.
+    # Sorting by this tuple puts note_offs before note_ons on the same tick and pitch.
+    note_events: list[tuple[int, int, int]] = []
     for event in events:
-        note = pretty_midi.Note(
-            velocity=event.velocity,
-            pitch=event.midi_note,
-            start=event.quantized_time,
-            end=event.quantized_time + note_duration,
+        note_events.append((to_tick(event.quantized_time), event.midi_note, event.velocity))
+        note_events.append((to_tick(event.quantized_time + NOTE_DURATION), event.midi_note, 0))
+    note_events.sort()
+
+    # Microseconds per quarter note, derived from the tick length the same way
+    # pretty_midi did so the truncated value matches bit for bit
+    tempo = int(6e7 / (60.0 / (seconds_per_tick * TICKS_PER_BEAT)))
+    tempo_track = mido.MidiTrack(
+        [
+            mido.MetaMessage("set_tempo", time=0, tempo=tempo),
+            mido.MetaMessage("time_signature", time=0, numerator=4, denominator=4),
+            mido.MetaMessage("end_of_track", time=1),
+        ]
+    )
+
+    drum_track = mido.MidiTrack(
+        [
+            mido.MetaMessage("track_name", time=0, name="Drums"),
+            mido.Message("program_change", time=0, program=0, channel=DRUM_CHANNEL),
+        ]
+    )
+    prev_tick = 0
+    for tick, note, velocity in note_events:
+        drum_track.append(
+            mido.Message(
+                "note_on",
+                time=tick - prev_tick,
+                channel=DRUM_CHANNEL,
+                note=note,
+                velocity=velocity,
+            )
         )
-        drum_inst.notes.append(note)
+        prev_tick = tick
+    drum_track.append(mido.MetaMessage("end_of_track", time=1))
 
-    midi.instruments.append(drum_inst)
-    midi.write(str(output_path))
+    mido.MidiFile(ticks_per_beat=TICKS_PER_BEAT, tracks=[tempo_track, drum_track]).save(
+        str(output_path)
+    )
     logger.info(f"MIDI written to {output_path} ({len(events)} notes, {bpm} BPM)")
     return output_path
@@ -60,24 +60,63 @@ DEFAULT_PARAMS = {
 }
 
 
-def _refine_onset_time(
-    y: np.ndarray, sr: int, coarse_sample: int, window_ms: float = 15.0, threshold_frac: float = 0.3
-) -> int:
-    """Find the true transient attack point near a coarse onset.
-
-    Searches a ±window_ms region around the coarse onset for the first sample
-    that exceeds threshold_frac of the local peak amplitude. This gives
-    sample-accurate timing (~0.02ms at 44.1kHz).
+SAMPLE_RATE = 44100
+
+
+def _refine_onset_times(
+    abs_y: np.ndarray,
+    sr: int,
+    coarse_samples: np.ndarray,
+    window_ms: float = 15.0,
+    threshold_frac: float = 0.3,
+) -> np.ndarray:
+    """Find the true transient attack points near a batch of coarse onsets.
+
+    Searches a ±window_ms region of the rectified signal abs_y around each
+    coarse onset for the first sample that exceeds threshold_frac of the local
+    peak amplitude. This gives sample-accurate timing (~0.02ms at 44.1kHz).
+    Onsets with a silent neighbourhood are left where they are.
     """
     window = int(window_ms / 1000.0 * sr)
-    start = max(0, coarse_sample - window)
-    end = min(len(y), coarse_sample + window)
-    segment = np.abs(y[start:end])
-    peak_val = np.max(segment)
-    if peak_val == 0:
-        return coarse_sample
-    above = np.where(segment >= threshold_frac * peak_val)[0]
-    return start + int(above[0]) if len(above) > 0 else coarse_sample
+    # Zero padding stands in for the clipped edges: it can neither raise the
+    # local peak nor cross a positive threshold
+    padded = np.pad(abs_y, window)
+    segments = np.lib.stride_tricks.sliding_window_view(padded, 2 * window)[coarse_samples]
+    peak_vals = segments.max(axis=1)
+    first_above = np.argmax(segments >= (threshold_frac * peak_vals)[:, None], axis=1)
+    return np.where(peak_vals > 0, coarse_samples - window + first_above, coarse_samples)
+
+
+def _rms_to_velocity(rms: np.ndarray) -> np.ndarray:
+    """Map RMS amplitudes to MIDI velocities (20-127) on a log scale.
+
+    Typical range: -50 dB (quiet) to 0 dB (max). Silent windows fall to the
+    -200 dB floor of the epsilon and clip to the minimum velocity.
+    """
+    db = 20 * np.log10(rms + 1e-10)
+    return np.clip((db + 50) / 50 * 127, 20, 127).astype(int)
+
+
+def warm_up() -> None:
+    """Run onset detection once on a short synthetic signal.
+
+    librosa's peak picking is numba-compiled on first use (over a second of
+    JIT); calling this when a worker starts keeps that off the first real stem.
+    """
+    y = np.random.default_rng(0).standard_normal(SAMPLE_RATE).astype(np.float32)
+    librosa.onset.onset_detect(
+        y=y, sr=SAMPLE_RATE, units="frames", hop_length=512, backtrack=True, wait=1
+    )
+
+
+def init_worker() -> None:
+    """Initializer for processes that run onset detection (the pipeline's CPU pool).
+
+    Spawned processes start with an unconfigured root logger, so logging is set
+    up as in app.main, then warm_up() compiles librosa's kernels.
+    """
+    logging.basicConfig(level=logging.INFO)
+    warm_up()
 
 
 def detect_peaks(stem_path: Path, bpm: float, stem_name: str | None = None) -> list[dict]:
@@ -93,7 +132,7 @@ def detect_peaks(stem_path: Path, bpm: float, stem_name: str | None = None) -> l
         List of dicts with keys: time, quantized_time, velocity
     """
     # Load audio
-    y, sr = librosa.load(str(stem_path), sr=44100, mono=True)
+    y, sr = librosa.load(str(stem_path), sr=SAMPLE_RATE, mono=True)
 
     if len(y) == 0:
         return []
@@ -123,53 +162,45 @@ def detect_peaks(stem_path: Path, bpm: float, stem_name: str | None = None) -> l
 
     # Sub-frame refinement for percussive stems
     if params.get("refine", False):
-        onset_samples = np.array([_refine_onset_time(y, sr, int(s)) for s in onset_samples])
+        abs_y = np.abs(y)
+        onset_samples = _refine_onset_times(abs_y, sr, onset_samples)
 
     onset_times = onset_samples / sr
 
     logger.info(f"Stem '{stem_name}': detected {len(onset_frames)} raw onsets")
 
-    # Measure velocity (RMS amplitude at each onset)
-    events = []
+    # Measure RMS amplitude in a 50ms window at every onset in one batched pass:
+    # gather all windows as an (onsets, window) matrix over a zero-padded signal,
+    # so windows running past the end only sum the samples that exist
+    window_samples = int(0.05 * sr)
+    starts = np.clip(onset_samples.astype(np.int64), 0, len(y))
+    lengths = np.minimum(len(y), starts + window_samples) - starts
+    has_audio = lengths > 0
+    kept_times = onset_times[has_audio]
+    starts, lengths = starts[has_audio], lengths[has_audio]
+
+    padded = np.pad(y, (0, window_samples))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window_samples)[starts]
+    rms_values = np.sqrt(np.einsum("ij,ij->i", windows, windows) / lengths)
+
+    # Map all RMS values to MIDI velocity in one pass
+    velocities = _rms_to_velocity(rms_values)
+
+    # Quantize to 16th note grid, snapping only onsets within tolerance
+    # (the rest keep their original time)
     sixteenth_duration = 60.0 / bpm / 4.0
     quantize_tolerance = params.get("quantize_tolerance", 0.30)
-
-    for time_sec, sample in zip(onset_times, onset_samples, strict=True):
-        # RMS in a window around the onset
-        window_samples = int(0.05 * sr)  # 50ms window
-        start = max(0, int(sample))
-        end = min(len(y), start + window_samples)
-        segment = y[start:end]
-
-        if len(segment) == 0:
-            continue
-
-        rms = np.sqrt(np.mean(segment**2))
-
-        # Map RMS to MIDI velocity (0-127)
-        # Use log scale for more natural dynamics
-        if rms > 0:
-            db = 20 * np.log10(rms + 1e-10)
-            # Typical range: -60 dB (very quiet) to 0 dB (max)
-            velocity = int(np.clip((db + 50) / 50 * 127, 20, 127))
-        else:
-            velocity = 20
-
-        # Quantize to 16th note grid with tolerance
-        grid_position = round(time_sec / sixteenth_duration)
-        quantized_time = grid_position * sixteenth_duration
-        deviation = abs(time_sec - quantized_time) / sixteenth_duration
-
-        # Only snap if within tolerance, otherwise keep original time
-        if deviation > quantize_tolerance:
-            quantized_time = time_sec
-
-        events.append(
-            {
-                "time": round(float(time_sec), 4),
-                "quantized_time": round(float(quantized_time), 4),
-                "velocity": velocity,
-            }
+    grid_times = np.rint(kept_times / sixteenth_duration) * sixteenth_duration
+    deviation = np.abs(kept_times - grid_times) / sixteenth_duration
+    quantized_times = np.where(deviation > quantize_tolerance, kept_times, grid_times)
+
+    return [
+        {
+            "time": round(time_sec, 4),
+            "quantized_time": round(quantized_time, 4),
+            "velocity": velocity,
+        }
+        for time_sec, quantized_time, velocity in zip(
+            kept_times.tolist(), quantized_times.tolist(), velocities.tolist(), strict=True
         )
-
-    return events
+    ]
@@ -1,13 +1,27 @@
 import asyncio
+import fcntl
 import hashlib
-import json
 import logging
+import multiprocessing
+import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-from app.models.job import JobStatus
+import numpy as np
+
+from app.config import settings
+from app.models.cluster import cluster_list_adapter
+from app.models.drum_event import event_list_adapter
+from app.models.job import Job, JobStatus
 from app.services import demucs as demucs_service
-from app.services import youtube
-from app.services.drum_clusterer import detect_onsets_from_stems, run_drum_separation
+from app.services import peak_detection, youtube
+from app.services.audio_io import decode_audio
+from app.services.drum_clusterer import (
+    STEM_MAPPING,
+    detect_onsets_from_stems,
+    run_drum_separation,
+)
 from app.services.midi_writer import write_midi
 from app.storage.file_manager import file_manager
 from app.storage.job_store import job_store
@@ -17,6 +31,126 @@ logger = logging.getLogger(__name__)
 # Ordered pipeline stages for checkpoint logic
 STAGES = ["download", "stem_separation", "drumsep", "onset_detection"]
 
+# Only this many jobs run the separation models (Demucs + DrumSep, plus the
+# decode and tempo detection that share Demucs' input) at once, so they don't
+# contend for the GPU; downloads run unthrottled and onset detection is bounded
+# by the CPU pool below
+_separation_slots = asyncio.Semaphore(settings.max_concurrent_separations)
+
+# Worker processes for the CPU-bound onset detection / post-processing stage, so
+# concurrent jobs run it in parallel instead of taking turns on the GIL. Models stay
+# in the main process; workers are spawned (not forked) since torch is loaded here.
+# The initializer and task functions live in torch-free modules, since a spawned
+# worker imports whatever module they come from.
+_cpu_pool: ProcessPoolExecutor | None = None
+
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = ProcessPoolExecutor(
+            # Each job's onset detection runs one thread per stem, so one worker
+            # per len(STEM_MAPPING) cores keeps the pool from oversubscribing them
+            max_workers=max(1, (os.cpu_count() or 1) // len(STEM_MAPPING)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=peak_detection.init_worker,
+        )
+    return _cpu_pool
+
+
+def shutdown_cpu_pool() -> None:
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(cancel_futures=True)
+        _cpu_pool = None
+
+
+# ioctl number of Linux FICLONE (fcntl.FICLONE is only exposed from Python 3.12)
+_FICLONE = 0x40049409
+
+
+def _clone_file(src: Path, dst: Path) -> None:
+    """Copy src to dst as a copy-on-write reflink where the filesystem supports it.
+
+    Falls back to a regular copy. Unlike a hardlink, the clone is a separate
+    inode, so rewriting one job's stems never touches another's.
+    """
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _hash_audio(path: Path) -> str:
+    """SHA-256 of an audio file, streamed from disk rather than read into memory."""
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+async def _detect_bpm(
+    job: Job, original_path: Path, audio: np.ndarray | None = None, sr: int | None = None
+) -> None:
+    """Auto-detect the BPM of a job that was created without one."""
+    from app.services.tempo import detect_tempo
+
+    detected_bpm = await asyncio.to_thread(detect_tempo, original_path, audio, sr)
+    job.bpm = detected_bpm
+    job_store._persist(job)
+    logger.info(f"Auto-detected BPM: {detected_bpm}")
+
+
+async def _separate(
+    job: Job, original_path: Path, audio: np.ndarray | None, sr: int | None, run_demucs: bool
+) -> None:
+    """Steps 2-3: Demucs stem separation (unless resuming past it), then DrumSep."""
+    existing_job = None
+
+    # Step 2: Stem separation (with dedup check)
+    if run_demucs:
+        drum_path = file_manager.drum_path(job.id)
+        other_path = file_manager.other_path(job.id)
+
+        # Check if stems already exist from a previous job with the same audio
+        if job.audio_hash:
+            existing_job = job_store.find_by_audio_hash(job.audio_hash, exclude_id=job.id)
+
+        if existing_job:
+            logger.info(f"Reusing stems from job {existing_job.id} (same audio hash)")
+            job_store.update_status(job.id, JobStatus.separating_stems, progress=15)
+            src_drum = file_manager.drum_path(existing_job.id)
+            src_other = file_manager.other_path(existing_job.id)
+            await asyncio.to_thread(_clone_file, src_drum, drum_path)
+            await asyncio.to_thread(_clone_file, src_other, other_path)
+            job_store.update_status(job.id, JobStatus.separating_stems, progress=50)
+        else:
+            job_store.update_status(job.id, JobStatus.separating_stems, progress=15)
+            logger.info("Running Demucs local stem separation...")
+            await asyncio.to_thread(
+                demucs_service.separate, original_path, drum_path, other_path, audio, sr
+            )
+            job_store.update_status(job.id, JobStatus.separating_stems, progress=50)
+
+    # Step 3: Separate drum track into individual instruments
+    drum_path = file_manager.drum_path(job.id)
+    job_store.update_status(job.id, JobStatus.separating_drum_instruments, progress=55)
+
+    # Same audio as a completed job: its DrumSep stems are reusable too
+    src_stems = file_manager.stems_dir(existing_job.id) if existing_job else None
+    if src_stems and any(src_stems.glob("*.wav")):
+        logger.info(f"Reusing drum instrument stems from job {existing_job.id}")
+        await asyncio.to_thread(
+            shutil.copytree,
+            src_stems,
+            file_manager.stems_dir(job.id),
+            copy_function=_clone_file,
+            dirs_exist_ok=True,
+        )
+    else:
+        logger.info("Separating drum instruments (kick, snare, toms, hh, cymbals)...")
+        await asyncio.to_thread(run_drum_separation, drum_path)
+
 
 async def run_pipeline(job_id: str, start_from: str | None = None) -> None:
     """Run the processing pipeline for a job.
@@ -44,57 +178,35 @@ async def run_pipeline(job_id: str, start_from: str | None = None) -> None:
         if should_run("download") and job.source == "youtube" and job.source_url:
             job_store.update_status(job_id, JobStatus.downloading_youtube, progress=5)
             logger.info(f"Downloading YouTube: {job.source_url}")
-            await asyncio.to_thread(youtube.download_youtube, job.source_url, original_path)
+            _, video_title = await asyncio.to_thread(
+                youtube.download_youtube, job.source_url, original_path
+            )
             # Update job title with actual video title
-            video_title = await asyncio.to_thread(youtube.get_video_title, job.source_url)
             if video_title:
                 job.title = video_title
                 job_store._persist(job)
-            # Compute audio hash for dedup (uploads already have it set)
-            audio_bytes = await asyncio.to_thread(original_path.read_bytes)
-            job.audio_hash = hashlib.sha256(audio_bytes).hexdigest()
 
-        # Auto-detect BPM if not provided
-        if job.bpm == 0:
-            from app.services.tempo import detect_tempo
+        # Compute audio hash for dedup off the request path, once per job
+        if job.audio_hash is None and original_path.exists():
+            job.audio_hash = await asyncio.to_thread(_hash_audio, original_path)
 
-            detected_bpm = await asyncio.to_thread(detect_tempo, original_path)
-            job.bpm = detected_bpm
-            job_store._persist(job)
-            logger.info(f"Auto-detected BPM: {detected_bpm}")
-
-        # Step 2: Stem separation (with dedup check)
-        if should_run("stem_separation"):
-            drum_path = file_manager.drum_path(job_id)
-            other_path = file_manager.other_path(job_id)
-
-            # Check if stems already exist from a previous job with the same audio
-            existing_job = None
-            if job.audio_hash:
-                existing_job = job_store.find_by_audio_hash(job.audio_hash, exclude_id=job_id)
-
-            if existing_job:
-                logger.info(f"Reusing stems from job {existing_job.id} (same audio hash)")
-                job_store.update_status(job_id, JobStatus.separating_stems, progress=15)
-                src_drum = file_manager.drum_path(existing_job.id)
-                src_other = file_manager.other_path(existing_job.id)
-                await asyncio.to_thread(shutil.copy2, src_drum, drum_path)
-                await asyncio.to_thread(shutil.copy2, src_other, other_path)
-                job_store.update_status(job_id, JobStatus.separating_stems, progress=50)
-            else:
-                job_store.update_status(job_id, JobStatus.separating_stems, progress=15)
-                logger.info("Running Demucs local stem separation...")
-                await asyncio.to_thread(
-                    demucs_service.separate, original_path, drum_path, other_path
-                )
-                job_store.update_status(job_id, JobStatus.separating_stems, progress=50)
-
-        # Step 3: Separate drum track into individual instruments
+        # Steps 2-3 run the separation models; wait for a free slot first. The
+        # original is only decoded once the slot is held, so queued jobs don't each
+        # keep a decoded copy in memory while they wait
         if should_run("drumsep"):
-            drum_path = file_manager.drum_path(job_id)
-            job_store.update_status(job_id, JobStatus.separating_drum_instruments, progress=55)
-            logger.info("Separating drum instruments (kick, snare, toms, hh, cymbals)...")
-            await asyncio.to_thread(run_drum_separation, drum_path)
+            async with _separation_slots:
+                # Decode the original once when both tempo detection and Demucs need it
+                audio, sr = None, None
+                if job.bpm == 0 and should_run("stem_separation"):
+                    audio, sr = await asyncio.to_thread(decode_audio, original_path)
+                if job.bpm == 0:
+                    await _detect_bpm(job, original_path, audio, sr)
+                await _separate(job, original_path, audio, sr, should_run("stem_separation"))
+                # Demucs was the last user of the decoded original; free it before
+                # onset detection
+                del audio
+        elif job.bpm == 0:
+            await _detect_bpm(job, original_path)
 
         # Step 4: Detect onsets per stem
         if should_run("onset_detection"):
@@ -102,17 +214,19 @@ async def run_pipeline(job_id: str, start_from: str | None = None) -> None:
             job_store.update_status(job_id, JobStatus.detecting_onsets, progress=65)
             logger.info("Detecting onsets per drum stem...")
 
-            events, clusters = await asyncio.to_thread(detect_onsets_from_stems, drum_path, job.bpm)
-
-            # Save events to JSON
-            events_path = file_manager.events_path(job_id)
-            events_data = [e.model_dump() for e in events]
-            events_path.write_text(json.dumps(events_data, indent=2))
-
-            # Save clusters to JSON
-            clusters_path = file_manager.clusters_path(job_id)
-            clusters_data = [c.model_dump() for c in clusters]
-            clusters_path.write_text(json.dumps(clusters_data, indent=2))
+            loop = asyncio.get_running_loop()
+            events, clusters = await loop.run_in_executor(
+                _get_cpu_pool(), detect_onsets_from_stems, drum_path, job.bpm
+            )
+
+            # Save events and clusters to JSON (serialized in pydantic-core,
+            # compact, the same way relabeling rewrites them)
+            file_manager.write_atomic(
+                file_manager.events_path(job_id), event_list_adapter.dump_json(events)
+            )
+            file_manager.write_atomic(
+                file_manager.clusters_path(job_id), cluster_list_adapter.dump_json(clusters)
+            )
 
             # Generate MIDI
             job_store.update_status(job_id, JobStatus.generating_midi, progress=85)
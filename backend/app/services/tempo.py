@@ -2,13 +2,24 @@ import logging
 from pathlib import Path
 
 import librosa
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+TEMPO_SR = 22050
 
-def detect_tempo(audio_path: Path) -> float:
-    """Detect the BPM of an audio file using librosa."""
-    y, sr = librosa.load(audio_path, sr=22050, mono=True)
+
+def detect_tempo(audio_path: Path, audio: np.ndarray | None = None, sr: int | None = None) -> float:
+    """Detect the BPM of an audio file using librosa.
+
+    If the file was already decoded, pass the (channels, samples) audio and its
+    sample rate to skip decoding it again.
+    """
+    if audio is None:
+        y, sr = librosa.load(audio_path, sr=TEMPO_SR, mono=True)
+    else:
+        y = librosa.resample(librosa.to_mono(audio), orig_sr=sr, target_sr=TEMPO_SR)
+        sr = TEMPO_SR
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
     bpm = float(tempo[0]) if hasattr(tempo, "__len__") else float(tempo)
     bpm = round(bpm)
@@ -2,25 +2,12 @@ import subprocess
 from pathlib import Path
 
 
-def get_video_title(url: str) -> str | None:
-    """Extract video title from a YouTube URL using yt-dlp."""
-    try:
-        result = subprocess.run(
-            ["yt-dlp", "--get-title", "--no-warnings", "--no-playlist", url],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            stdin=subprocess.DEVNULL,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+def download_youtube(url: str, output_path: Path) -> tuple[Path, str | None]:
+    """Download audio from YouTube URL as MP3 using yt-dlp.
 
-
-def download_youtube(url: str, output_path: Path) -> Path:
-    """Download audio from YouTube URL as MP3 using yt-dlp."""
+    Returns (path, video title); the title is printed by the same yt-dlp run
+    that downloads, so the metadata is only fetched once.
+    """
     # Give yt-dlp the path WITHOUT extension — it adds .mp3 via --audio-format
     stem_path = output_path.with_suffix("")
     cmd = [
@@ -32,10 +19,16 @@ def download_youtube(url: str, output_path: Path) -> Path:
         "0",
         "--no-playlist",
         "--no-warnings",
+        "--socket-timeout",
+        "30",
+        # Print the title once the file is in place (this does not skip the download)
+        "--print",
+        "after_move:title",
         "-o",
         str(stem_path) + ".%(ext)s",
         url,
     ]
+    # The overall timeout also bounds trickling downloads and a stuck ffmpeg
     result = subprocess.run(
         cmd,
         capture_output=True,
@@ -46,5 +39,5 @@ def download_youtube(url: str, output_path: Path) -> Path:
     if result.returncode != 0:
         raise RuntimeError(f"yt-dlp failed: {result.stderr}")
     if output_path.exists():
-        return output_path
+        return output_path, result.stdout.strip() or None
     raise FileNotFoundError(f"Downloaded file not found at {output_path}")
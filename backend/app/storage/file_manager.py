@@ -1,4 +1,5 @@
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
 from app.config import settings
@@ -23,10 +24,25 @@ CHECKPOINT_REQUIRED: dict[str, list[str]] = {
 }
 
 
+@lru_cache(maxsize=4096)
+def _ensure_dir(path: Path) -> None:
+    """mkdir -p, done at most once per directory for the life of the process."""
+    path.mkdir(parents=True, exist_ok=True)
+
+
 class FileManager:
+    """Paths of a job's artifacts.
+
+    Path accessors are pure and never touch the filesystem; writers call
+    ensure_job_dir() before creating files in a job directory.
+    """
+
     def job_dir(self, job_id: str) -> Path:
-        d = settings.jobs_dir / job_id
-        d.mkdir(parents=True, exist_ok=True)
+        return settings.jobs_dir / job_id
+
+    def ensure_job_dir(self, job_id: str) -> Path:
+        d = self.job_dir(job_id)
+        _ensure_dir(d)
         return d
 
     def original_path(self, job_id: str) -> Path:
@@ -48,13 +64,21 @@ class FileManager:
         return self.job_dir(job_id) / "clusters.json"
 
     def stems_dir(self, job_id: str) -> Path:
-        d = self.job_dir(job_id) / "stems"
-        d.mkdir(parents=True, exist_ok=True)
-        return d
+        return self.job_dir(job_id) / "stems"
 
     def drum_stem_path(self, job_id: str, stem_name: str) -> Path:
         return self.stems_dir(job_id) / f"{stem_name}.wav"
 
+    def write_atomic(self, path: Path, data: bytes) -> None:
+        """Write data to a temp file and rename it over path.
+
+        Readers (and a FileResponse already streaming the old file) only ever
+        see a complete file, never a partly rewritten one.
+        """
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
     def clear_from_checkpoint(self, job_id: str, checkpoint: str) -> None:
         """Delete downstream artifacts for a given checkpoint."""
         artifacts = CHECKPOINT_ARTIFACTS.get(checkpoint, [])
@@ -62,8 +86,7 @@ class FileManager:
         for name in artifacts:
             path = job / name
             if name.endswith("/"):
-                if path.exists():
-                    shutil.rmtree(path)
+                shutil.rmtree(path, ignore_errors=True)
             else:
                 path.unlink(missing_ok=True)
 
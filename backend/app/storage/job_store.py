@@ -1,44 +1,98 @@
-import json
+import atexit
 import logging
+import os
+import threading
 
 from app.config import settings
 from app.models.job import Job, JobStatus
+from app.storage.file_manager import file_manager
 
 logger = logging.getLogger(__name__)
 
+# Non-terminal status updates are coalesced and written at most this often
+PERSIST_INTERVAL_S = 2.0
+
+TERMINAL_STATUSES = {JobStatus.complete, JobStatus.failed}
+
 
 class JobStore:
     def __init__(self) -> None:
         self._jobs: dict[str, Job] = {}
+        # audio_hash -> ids of jobs with that audio, in the order they were indexed
+        self._by_hash: dict[str, list[str]] = {}
+        # Jobs whose in-memory state is ahead of job.json, flushed by a timer
+        self._dirty: set[str] = set()
+        self._flush_timer: threading.Timer | None = None
+        self._lock = threading.Lock()
         self._load_from_disk()
+        atexit.register(self.flush)
 
     def _job_json_path(self, job_id: str):
-        return settings.jobs_dir / job_id / "job.json"
+        return file_manager.job_dir(job_id) / "job.json"
 
     def _persist(self, job: Job) -> None:
         path = self._job_json_path(job.id)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(job.model_dump(), indent=2))
+        file_manager.ensure_job_dir(job.id)
+        # Write a temp file and rename it over job.json, so readers (and a restart
+        # after a crash mid-write) only ever see a complete file
+        tmp_path = path.with_suffix(".json.tmp")
+        with self._lock:
+            self._dirty.discard(job.id)
+            tmp_path.write_text(job.model_dump_json(indent=2), encoding="utf-8")
+            tmp_path.replace(path)
+
+    def _mark_dirty(self, job_id: str) -> None:
+        with self._lock:
+            self._dirty.add(job_id)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(PERSIST_INTERVAL_S, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write every job with pending status updates to disk."""
+        with self._lock:
+            self._flush_timer = None
+            dirty, self._dirty = self._dirty, set()
+        for job_id in dirty:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._persist(job)
+
+    def _index_hash(self, job: Job) -> None:
+        if job.audio_hash is None:
+            return
+        job_ids = self._by_hash.setdefault(job.audio_hash, [])
+        if job.id not in job_ids:
+            job_ids.append(job.id)
 
     def _load_from_disk(self) -> None:
+        # Parsed up front (at import, before the event loop serves requests) so
+        # lookups never hit the disk from a request handler
         jobs_dir = settings.jobs_dir
         if not jobs_dir.exists():
             return
-        for job_dir in jobs_dir.iterdir():
-            if not job_dir.is_dir():
-                continue
-            job_json = job_dir / "job.json"
-            if not job_json.exists():
-                continue
-            try:
-                data = json.loads(job_json.read_text())
-                job = Job(**data)
-                self._jobs[job.id] = job
-            except Exception:
-                logger.warning(f"Failed to load job from {job_json}", exc_info=True)
+        with os.scandir(jobs_dir) as it:
+            job_ids = [entry.name for entry in it if entry.is_dir()]
+        for job_id in job_ids:
+            self._load_job(job_id)
+
+    def _load_job(self, job_id: str) -> Job | None:
+        path = self._job_json_path(job_id)
+        if not path.exists():
+            return None
+        try:
+            job = Job.model_validate_json(path.read_bytes())
+        except Exception:
+            logger.warning(f"Failed to load job from {path}", exc_info=True)
+            return None
+        self._jobs[job.id] = job
+        self._index_hash(job)
+        return job
 
     def create(self, job: Job) -> Job:
         self._jobs[job.id] = job
+        self._index_hash(job)
         self._persist(job)
         return job
 
@@ -47,16 +101,7 @@ class JobStore:
         if job is not None:
             return job
         # Try loading from disk (in case it was created by another process)
-        path = self._job_json_path(job_id)
-        if path.exists():
-            try:
-                data = json.loads(path.read_text())
-                job = Job(**data)
-                self._jobs[job.id] = job
-                return job
-            except Exception:
-                logger.warning(f"Failed to load job from {path}", exc_info=True)
-        return None
+        return self._load_job(job_id)
 
     def update_status(
         self,
@@ -65,21 +110,31 @@ class JobStore:
         progress: float = 0.0,
         error: str | None = None,
     ) -> Job | None:
-        job = self._jobs.get(job_id)
+        job = self.get(job_id)
         if job is None:
             return None
         job.status = status
         job.progress = progress
         if error is not None:
             job.error = error
-        self._persist(job)
+        # Progress updates only need to reach disk eventually; final states are
+        # written right away
+        if status in TERMINAL_STATUSES:
+            if status == JobStatus.complete:
+                # The hash is computed mid-pipeline, after create
+                self._index_hash(job)
+            self._persist(job)
+        else:
+            self._mark_dirty(job_id)
         return job
 
     def find_by_audio_hash(self, audio_hash: str, exclude_id: str) -> Job | None:
         """Find a completed job with the same audio hash (for stem reuse)."""
-        for job in self._jobs.values():
+        for job_id in self._by_hash.get(audio_hash, ()):
+            job = self._jobs.get(job_id)
             if (
-                job.id != exclude_id
+                job is not None
+                and job.id != exclude_id
                 and job.audio_hash == audio_hash
                 and job.status == JobStatus.complete
             ):
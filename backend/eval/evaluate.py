@@ -17,7 +17,9 @@ Usage (from backend/ directory):
 
 import argparse
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -33,7 +35,7 @@ def _cmd_generate_patterns(args: argparse.Namespace) -> None:
 
 
 def _cmd_generate_dataset(args: argparse.Namespace) -> None:
-    from eval.generate_dataset import render_midi_to_dataset
+    from eval.generate_dataset import _load_kit_samples, render_midi_to_dataset
 
     midi_dir = Path(args.midi_dir)
     kit_json = Path(args.sample_kit)
@@ -49,29 +51,79 @@ def _cmd_generate_dataset(args: argparse.Namespace) -> None:
     if snr_db is not None:
         print(f"  Adding white noise at SNR={snr_db} dB")
 
-    for midi_path in midi_files:
-        sample_dir = output_dir / midi_path.stem
-        print(f"  {midi_path.name} → {sample_dir.name}/")
-        meta = render_midi_to_dataset(
-            midi_path=midi_path,
-            kit_json_path=kit_json,
-            output_dir=sample_dir,
-            snr_db=snr_db,
-        )
+    # Each MIDI renders into its own sample dir, so they run in parallel; every
+    # worker decodes the kit once up front and reuses it for all its renders
+    max_workers = min(len(midi_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_load_kit_samples, initargs=(kit_json,)
+    ) as pool:
+        futures = [
+            pool.submit(
+                render_midi_to_dataset,
+                midi_path=midi_path,
+                kit_json_path=kit_json,
+                output_dir=output_dir / midi_path.stem,
+                snr_db=snr_db,
+            )
+            for midi_path in midi_files
+        ]
+        metas = [future.result() for future in futures]
+
+    for midi_path, meta in zip(midi_files, metas, strict=True):
+        print(f"  {midi_path.name} → {midi_path.stem}/")
         if meta:
             print(f"    BPM={meta['bpm']}, events={meta['event_count']}, dur={meta['duration_s']:.1f}s")
 
     print("Done.")
 
 
-def _cmd_evaluate(args: argparse.Namespace) -> None:
+def _evaluate_sample(sample_dir: Path, tolerance_s: float) -> dict:
+    """Run onset detection on one dataset sample and score it against its ground truth.
+
+    Runs in a worker process; failures are returned as {"error": ...} so the
+    parent can report them in sample order.
+    """
     from app.services.drum_clusterer import detect_onsets_from_stems
-    from eval.metrics import (
-        compute_confusion_matrix,
-        compute_f_measure,
-        compute_onset_mae,
-        compute_velocity_rmse,
+    from eval.metrics import ALL_GROUPS, compute_all_metrics
+
+    # Load ground truth and meta
+    with open(sample_dir / "ground_truth.json") as f:
+        ground_truth = json.load(f)
+
+    with open(sample_dir / "meta.json") as f:
+        meta = json.load(f)
+
+    bpm = meta["bpm"]
+    mix_wav = sample_dir / "mix.wav"
+
+    # Run onset detection (fast path — stems already on disk)
+    try:
+        predicted, _ = detect_onsets_from_stems(mix_wav, bpm)
+    except Exception as e:
+        return {"error": str(e)}
+
+    # Compute metrics
+    fm_result, onset_mae, vel_rmse, confusion = compute_all_metrics(
+        predicted, ground_truth, tolerance_s
     )
+
+    return {
+        "result": {
+            "sample": sample_dir.name,
+            "bpm": bpm,
+            "gt_events": len(ground_truth),
+            "pred_events": len(predicted),
+            "fm": fm_result,
+            "onset_mae_ms": onset_mae,
+            "vel_rmse": vel_rmse,
+        },
+        "confusion": confusion,
+        "groups": ALL_GROUPS,
+    }
+
+
+def _cmd_evaluate(args: argparse.Namespace) -> None:
+    from app.services.drum_clusterer import STEM_MAPPING
     from eval.report import (
         print_aggregate_table,
         print_confusion_matrix,
@@ -84,10 +136,19 @@ def _cmd_evaluate(args: argparse.Namespace) -> None:
     output_json = Path(args.output_json) if args.output_json else None
 
     # Find all sample directories (each must have mix.wav + ground_truth.json + meta.json)
-    sample_dirs = sorted(
-        d for d in dataset_dir.iterdir()
-        if d.is_dir() and (d / "mix.wav").exists() and (d / "ground_truth.json").exists()
-    )
+    # (scandir entries carry their file type, so only the two files cost a stat each)
+    sample_dirs: list[Path] = []
+    with os.scandir(dataset_dir) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            try:
+                os.stat(os.path.join(entry.path, "mix.wav"))
+                os.stat(os.path.join(entry.path, "ground_truth.json"))
+            except FileNotFoundError:
+                continue
+            sample_dirs.append(Path(entry.path))
+    sample_dirs.sort()
 
     if not sample_dirs:
         print(f"Error: no valid sample directories found in {dataset_dir}", file=sys.stderr)
@@ -100,46 +161,26 @@ def _cmd_evaluate(args: argparse.Namespace) -> None:
     all_results: list[dict] = []
     aggregate_confusion = np.zeros((5, 5), dtype=int)
 
-    for sample_dir in sample_dirs:
-        # Load ground truth and meta
-        with open(sample_dir / "ground_truth.json") as f:
-            ground_truth = json.load(f)
-
-        with open(sample_dir / "meta.json") as f:
-            meta = json.load(f)
-
-        bpm = meta["bpm"]
-        mix_wav = sample_dir / "mix.wav"
-
-        # Run onset detection (fast path — stems already on disk)
-        try:
-            predicted, _ = detect_onsets_from_stems(mix_wav, bpm)
-        except Exception as e:
-            print(f"  Warning: {sample_dir.name} failed: {e}")
-            continue
-
-        # Compute metrics
-        fm_result, matched, fp_events, fn_events = compute_f_measure(
-            predicted, ground_truth, tolerance_s
-        )
-        onset_mae = compute_onset_mae(matched)
-        vel_rmse = compute_velocity_rmse(matched)
-        confusion, groups = compute_confusion_matrix(predicted, ground_truth, tolerance_s)
-
-        aggregate_confusion += confusion
-
-        result = {
-            "sample": sample_dir.name,
-            "bpm": bpm,
-            "gt_events": len(ground_truth),
-            "pred_events": len(predicted),
-            "fm": fm_result,
-            "onset_mae_ms": onset_mae,
-            "vel_rmse": vel_rmse,
-        }
-        all_results.append(result)
-
-        print_sample_table(sample_dir.name, fm_result, onset_mae, vel_rmse)
+    # Samples are independent, so score them in parallel; results come back in order.
+    # Each sample already runs one detection thread per stem, so size the pool to
+    # cpu_count // stems rather than oversubscribing the cores
+    cores_per_sample = len(STEM_MAPPING)
+    max_workers = min(len(sample_dirs), max(1, (os.cpu_count() or 1) // cores_per_sample))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        outcomes = pool.map(_evaluate_sample, sample_dirs, [tolerance_s] * len(sample_dirs))
+        for sample_dir, outcome in zip(sample_dirs, outcomes, strict=True):
+            if "error" in outcome:
+                print(f"  Warning: {sample_dir.name} failed: {outcome['error']}")
+                continue
+
+            result = outcome["result"]
+            aggregate_confusion += outcome["confusion"]
+            groups = outcome["groups"]
+            all_results.append(result)
+
+            print_sample_table(
+                sample_dir.name, result["fm"], result["onset_mae_ms"], result["vel_rmse"]
+            )
 
     if all_results:
         # Reformat for aggregate table (uses 'fm' key internally)
@@ -5,6 +5,7 @@ producing a ground-truth-annotated dataset for evaluating drum transcription.
 """
 
 import json
+from functools import lru_cache
 from pathlib import Path
 
 import librosa
@@ -78,14 +79,31 @@ def _parse_midi(midi_path: Path) -> tuple[float, list[tuple[float, int, int]]]:
     events: list[tuple[float, int, int]] = []
 
     for track in mid.tracks:
-        current_time_s = 0.0
-        for msg in track:
-            current_time_s += mido.tick2second(msg.time, mid.ticks_per_beat, tempo)
+        tempo_changes: list[int] = []  # indices of set_tempo messages
+        drum_hits: list[int] = []  # indices of drum note_ons
+        for i, msg in enumerate(track):
             if msg.type == "set_tempo":
-                tempo = msg.tempo
-                bpm = mido.tempo2bpm(tempo)
+                tempo_changes.append(i)
             elif msg.type == "note_on" and msg.velocity > 0 and msg.channel == 9:
-                events.append((current_time_s, msg.note, msg.velocity))
+                drum_hits.append(i)
+
+        # Tempo each message's delta is played at: the one in effect before it
+        # (tempo state carries over from the previous track)
+        segment_tempos = np.array([tempo] + [track[i].tempo for i in tempo_changes])
+        segment = np.searchsorted(np.array(tempo_changes) + 1, np.arange(len(track)), "right")
+        seconds_per_tick = segment_tempos[segment] * 1e-6 / mid.ticks_per_beat
+
+        # Absolute times from the tick deltas in one cumulative sum
+        deltas = np.fromiter((msg.time for msg in track), dtype=np.float64, count=len(track))
+        times = np.cumsum(deltas * seconds_per_tick)
+
+        events.extend(
+            (time_s, track[i].note, track[i].velocity)
+            for time_s, i in zip(times[drum_hits].tolist(), drum_hits, strict=True)
+        )
+        if tempo_changes:
+            tempo = track[tempo_changes[-1]].tempo
+            bpm = mido.tempo2bpm(tempo)
 
     events.sort(key=lambda x: x[0])
     return bpm, events
@@ -94,11 +112,20 @@ def _parse_midi(midi_path: Path) -> tuple[float, list[tuple[float, int, int]]]:
 def _load_kit_samples(kit_json_path: Path) -> dict[str, list[np.ndarray]]:
     """Load all WAV samples from a kit.json into memory.
 
+    Decoded kits are cached per (kit.json path, mtime), so rendering many MIDI
+    files against one kit decodes its samples once. The arrays are shared
+    between renders and therefore read-only.
+
     Returns:
         Dict mapping kit_key → list of mono float32 arrays at SAMPLE_RATE
     """
-    kit_dir = kit_json_path.parent
-    with open(kit_json_path) as f:
+    return _read_kit_samples(str(kit_json_path), kit_json_path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _read_kit_samples(kit_json: str, mtime_ns: int) -> dict[str, list[np.ndarray]]:
+    kit_dir = Path(kit_json).parent
+    with open(kit_json) as f:
         kit: dict[str, list[str]] = json.load(f)
 
     samples: dict[str, list[np.ndarray]] = {}
@@ -107,7 +134,14 @@ def _load_kit_samples(kit_json_path: Path) -> dict[str, list[np.ndarray]]:
         for filename in filenames:
             wav_path = kit_dir / filename
             if wav_path.exists():
-                audio = librosa.load(str(wav_path), sr=SAMPLE_RATE, mono=True)[0].astype(np.float32)
+                # Read with soundfile directly; only kits not already at
+                # SAMPLE_RATE go through librosa's resampler
+                audio, sr = sf.read(str(wav_path), dtype="float32")
+                if audio.ndim == 2:
+                    audio = audio.mean(axis=1)
+                if sr != SAMPLE_RATE:
+                    audio = librosa.resample(audio, orig_sr=sr, target_sr=SAMPLE_RATE)
+                audio.flags.writeable = False
                 loaded.append(audio)
         if loaded:
             samples[kit_key] = loaded
@@ -115,6 +149,24 @@ def _load_kit_samples(kit_json_path: Path) -> dict[str, list[np.ndarray]]:
     return samples
 
 
+def _render_stem(buf: np.ndarray, hits: list[tuple[int, float, np.ndarray]]) -> None:
+    """Mix (onset sample, gain, kit sample) hits into buf, overwriting its contents."""
+    buf.fill(0.0)
+    total_samples = len(buf)
+    for onset, amplitude, sample in hits:
+        end = min(total_samples, onset + len(sample))
+        chunk_len = end - onset
+        if chunk_len > 0:
+            buf[onset:end] += amplitude * sample[:chunk_len]
+
+
+def _white_noise(seed: np.random.SeedSequence, size: int, rms: float) -> np.ndarray:
+    """Gaussian white noise at the given RMS, reproducible from its seed."""
+    noise = np.random.default_rng(seed).standard_normal(size, dtype=np.float32)
+    noise *= rms
+    return noise
+
+
 def render_midi_to_dataset(
     midi_path: Path,
     kit_json_path: Path,
@@ -155,17 +207,24 @@ def render_midi_to_dataset(
     total_duration_s = midi_events[-1][0] + 2.0
     total_samples = int(total_duration_s * SAMPLE_RATE)
 
-    # Per-kit-key audio buffers
-    kit_buffers: dict[str, np.ndarray] = {
-        key: np.zeros(total_samples, dtype=np.float32)
-        for key in samples
+    # Hits grouped by DrumSep stem as (onset sample, gain, kit sample); the audio
+    # is rendered one stem at a time from these so only one stem buffer is live
+    stem_hits: dict[str, list[tuple[int, float, np.ndarray]]] = {
+        stem_name: [] for stem_name in STEM_COMPOSITION
     }
     rr_counters: dict[str, int] = {key: 0 for key in samples}
 
+    # Onset sample and quadratic velocity gain of every event, in one pass
+    times, _, velocities = (np.array(column) for column in zip(*midi_events, strict=True))
+    onsets = np.rint(times * SAMPLE_RATE).astype(np.int64).tolist()
+    amplitudes = ((velocities / 127.0) ** 2).tolist()
+
     # Ground truth events
     gt_events: list[dict] = []
 
-    for time_s, gm_note, velocity in midi_events:
+    for (time_s, gm_note, velocity), onset, amplitude in zip(
+        midi_events, onsets, amplitudes, strict=True
+    ):
         kit_key = GM_TO_KIT_KEY.get(gm_note)
         if kit_key is None or kit_key not in samples:
             continue
@@ -173,16 +232,8 @@ def render_midi_to_dataset(
         # Round-robin sample selection
         sample_list = samples[kit_key]
         idx = rr_counters[kit_key] % len(sample_list)
-        sample = sample_list[idx]
         rr_counters[kit_key] += 1
-
-        # Mix with quadratic velocity scaling
-        amplitude = (velocity / 127.0) ** 2
-        onset = int(round(time_s * SAMPLE_RATE))
-        end = min(total_samples, onset + len(sample))
-        chunk_len = end - onset
-        if chunk_len > 0:
-            kit_buffers[kit_key][onset:end] += amplitude * sample[:chunk_len]
+        stem_hits[KIT_KEY_TO_STEM_GROUP[kit_key]].append((onset, amplitude, sample_list[idx]))
 
         # Ground truth event
         drum_type = KIT_KEY_TO_DRUM_TYPE[kit_key]
@@ -198,50 +249,49 @@ def render_midi_to_dataset(
             }
         )
 
-    # Build 5 DrumSep stems by summing per-kit-key buffers
-    stem_buffers: dict[str, np.ndarray] = {}
-    for stem_name, kit_keys in STEM_COMPOSITION.items():
-        stem = np.zeros(total_samples, dtype=np.float32)
-        for key in kit_keys:
-            if key in kit_buffers:
-                stem += kit_buffers[key]
-        stem_buffers[stem_name] = stem
-
-    # Full mix
+    # First pass: full mix, summed stem by stem through one reused buffer
+    stem = np.empty(total_samples, dtype=np.float32)
     mix = np.zeros(total_samples, dtype=np.float32)
-    for stem in stem_buffers.values():
+    for hits in stem_hits.values():
+        _render_stem(stem, hits)
         mix += stem
 
-    # Add white noise to stems if SNR requested
+    # Add white noise to stems if SNR requested (the mix gets the same noise).
+    # Each stem draws from its own seeded generator so the second pass can
+    # regenerate exactly the noise that went into the mix.
+    noise_rms = 0.0
+    noise_seeds: list[np.random.SeedSequence] = []
     if snr_db is not None:
         signal_rms = float(np.sqrt(np.mean(mix**2)))
         if signal_rms > 0:
             noise_rms = signal_rms / (10.0 ** (snr_db / 20.0))
-            rng = np.random.default_rng()
-            for stem_name in stem_buffers:
-                noise = (noise_rms * rng.standard_normal(total_samples)).astype(np.float32)
-                stem_buffers[stem_name] = stem_buffers[stem_name] + noise
-            # Recompute mix after adding noise
-            mix = np.zeros(total_samples, dtype=np.float32)
-            for stem in stem_buffers.values():
-                mix += stem
+            noise_seeds = np.random.SeedSequence().spawn(len(stem_hits))
+            for seed in noise_seeds:
+                mix += _white_noise(seed, total_samples, noise_rms)
 
     # Peak-normalize mix to 0.95
+    scale = 1.0
     max_val = float(np.max(np.abs(mix)))
     if max_val > 0:
         scale = 0.95 / max_val
-        mix = mix * scale
-        for stem_name in stem_buffers:
-            stem_buffers[stem_name] = stem_buffers[stem_name] * scale
+        mix *= scale
 
     # Write output
-    output_dir.mkdir(parents=True, exist_ok=True)
     stems_dir = output_dir / "stems"
-    stems_dir.mkdir(exist_ok=True)
+    stems_dir.mkdir(parents=True, exist_ok=True)  # creates output_dir too
 
     sf.write(str(output_dir / "mix.wav"), mix, SAMPLE_RATE)
-    for stem_name, buf in stem_buffers.items():
-        sf.write(str(stems_dir / f"{stem_name}.wav"), buf, SAMPLE_RATE)
+    del mix
+
+    # Second pass: re-render each stem with its noise and the mix's gain, and
+    # write it out before moving on to the next
+    for i, (stem_name, hits) in enumerate(stem_hits.items()):
+        _render_stem(stem, hits)
+        if noise_seeds:
+            stem += _white_noise(noise_seeds[i], total_samples, noise_rms)
+        if max_val > 0:
+            stem *= scale
+        sf.write(str(stems_dir / f"{stem_name}.wav"), stem, SAMPLE_RATE)
 
     gt_events.sort(key=lambda e: e["time"])
     with open(output_dir / "ground_truth.json", "w") as f:
@@ -5,6 +5,7 @@ over the 5 DrumSep stem groups.
 """
 
 import math
+from typing import NamedTuple
 
 import numpy as np
 
@@ -34,6 +35,148 @@ def _gt_group(gt: dict) -> str:
     return gt.get("stem_group") or STEM_GROUPS.get(gt.get("drum_type", ""), "unknown")
 
 
+_GROUP_INDEX = {g: i for i, g in enumerate(ALL_GROUPS)}
+
+
+class _EventArrays(NamedTuple):
+    """Fields of an event list as parallel arrays (one entry per event)."""
+
+    quantized_time: np.ndarray
+    time: np.ndarray
+    velocity: np.ndarray
+    group: np.ndarray  # ALL_GROUPS index, -1 if the group is not one of them
+
+
+def _snapshot(rows: list[tuple[float, float, int, int]]) -> _EventArrays:
+    data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return _EventArrays(
+        quantized_time=data[:, 0],
+        time=data[:, 1],
+        velocity=data[:, 2].astype(np.int64),
+        group=data[:, 3].astype(np.int64),
+    )
+
+
+def _snapshot_predicted(predicted: list[DrumEvent]) -> _EventArrays:
+    """Read every predicted event's fields once, in a single pass."""
+    return _snapshot(
+        [
+            (p.quantized_time, p.time, p.velocity, _GROUP_INDEX.get(_pred_group(p), -1))
+            for p in predicted
+        ]
+    )
+
+
+def _snapshot_ground_truth(ground_truth: list[dict]) -> _EventArrays:
+    """Read every GT event's fields once, in a single pass."""
+    return _snapshot(
+        [
+            (g["quantized_time"], g["time"], g["velocity"], _GROUP_INDEX.get(_gt_group(g), -1))
+            for g in ground_truth
+        ]
+    )
+
+
+def _greedy_match(
+    pred_times: np.ndarray, gt_times: np.ndarray, tolerance_s: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Greedy nearest-first one-to-one matching of predicted and GT onset times.
+
+    Pairs within tolerance are taken in order of increasing |time difference|
+    (ties in input order), skipping any whose pred or GT is already matched.
+    Candidates come from each pred's tolerance window over the time-sorted GTs,
+    so only nearby pairs are ever built.
+
+    Returns:
+        (pred indices, gt indices) of the matched pairs, in the order matched
+    """
+    if len(pred_times) == 0 or len(gt_times) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    gt_order = np.argsort(gt_times, kind="stable")
+    sorted_gt_times = gt_times[gt_order]
+
+    # The window is widened slightly so float rounding in its bounds can never
+    # drop a pair that the exact |diff| <= tolerance check accepts
+    window_s = tolerance_s + 1e-9
+    lo = np.searchsorted(sorted_gt_times, pred_times - window_s, side="left")
+    hi = np.searchsorted(sorted_gt_times, pred_times + window_s, side="right")
+
+    # Expand every pred's window into (pred, gt) candidate pairs
+    counts = hi - lo
+    cand_pred = np.repeat(np.arange(len(pred_times)), counts)
+    within_window = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cand_gt = gt_order[np.repeat(lo, counts) + within_window]
+
+    diffs = np.abs(pred_times[cand_pred] - gt_times[cand_gt])
+    in_tolerance = diffs <= tolerance_s
+    cand_pred, cand_gt, diffs = cand_pred[in_tolerance], cand_gt[in_tolerance], diffs[in_tolerance]
+    order = np.lexsort((cand_gt, cand_pred, diffs))
+
+    pred_used = [False] * len(pred_times)
+    gt_used = [False] * len(gt_times)
+    matched_pred: list[int] = []
+    matched_gt: list[int] = []
+    for i, j in zip(cand_pred[order].tolist(), cand_gt[order].tolist(), strict=True):
+        if not pred_used[i] and not gt_used[j]:
+            pred_used[i] = gt_used[j] = True
+            matched_pred.append(i)
+            matched_gt.append(j)
+    return np.array(matched_pred, dtype=np.int64), np.array(matched_gt, dtype=np.int64)
+
+
+def _match_by_group(
+    pred_times: np.ndarray,
+    gt_times: np.ndarray,
+    pred_codes: np.ndarray,
+    gt_codes: np.ndarray,
+    tolerance_s: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Greedy matching within each stem group.
+
+    Returns:
+        (pred positions, gt positions) of the matched pairs, group by group
+    """
+    # Bin positions by group with one stable sort per side: each group is then a
+    # contiguous, position-ordered slice (events outside ALL_GROUPS sort first, unused)
+    pred_order = np.argsort(pred_codes, kind="stable")
+    gt_order = np.argsort(gt_codes, kind="stable")
+    codes = np.arange(len(ALL_GROUPS) + 1)
+    pred_bounds = np.searchsorted(pred_codes[pred_order], codes).tolist()
+    gt_bounds = np.searchsorted(gt_codes[gt_order], codes).tolist()
+
+    matched_preds: list[np.ndarray] = []
+    matched_gts: list[np.ndarray] = []
+    for code in range(len(ALL_GROUPS)):
+        preds = pred_order[pred_bounds[code] : pred_bounds[code + 1]]
+        gts = gt_order[gt_bounds[code] : gt_bounds[code + 1]]
+        pred_idx, gt_idx = _greedy_match(pred_times[preds], gt_times[gts], tolerance_s)
+        matched_preds.append(preds[pred_idx])
+        matched_gts.append(gts[gt_idx])
+    return np.concatenate(matched_preds), np.concatenate(matched_gts)
+
+
+def _split_matches(
+    predicted: list[DrumEvent],
+    ground_truth: list[dict],
+    matched_preds: np.ndarray,
+    matched_gts: np.ndarray,
+) -> tuple[list[tuple[DrumEvent, dict]], list[DrumEvent], list[dict]]:
+    """Turn matched positions into (matched pairs, unmatched preds, unmatched GTs)."""
+    pred_matched = np.zeros(len(predicted), dtype=bool)
+    gt_matched = np.zeros(len(ground_truth), dtype=bool)
+    pred_matched[matched_preds] = True
+    gt_matched[matched_gts] = True
+
+    matched = [
+        (predicted[i], ground_truth[j])
+        for i, j in zip(matched_preds.tolist(), matched_gts.tolist(), strict=True)
+    ]
+    unmatched_pred = [predicted[i] for i in np.flatnonzero(~pred_matched).tolist()]
+    unmatched_gt = [ground_truth[j] for j in np.flatnonzero(~gt_matched).tolist()]
+    return matched, unmatched_pred, unmatched_gt
+
+
 def match_events(
     predicted: list[DrumEvent],
     ground_truth: list[dict],
@@ -54,90 +197,44 @@ def match_events(
         unmatched_pred: Predicted events with no GT match (false positives)
         unmatched_gt: GT events with no predicted match (false negatives)
     """
-    # Group by stem group
-    pred_by_group: dict[str, list[DrumEvent]] = {}
-    for pred in predicted:
-        pred_by_group.setdefault(_pred_group(pred), []).append(pred)
-
-    gt_by_group: dict[str, list[dict]] = {}
-    for gt in ground_truth:
-        gt_by_group.setdefault(_gt_group(gt), []).append(gt)
-
-    matched: list[tuple[DrumEvent, dict]] = []
-    matched_pred_ids: set[int] = set()
-    matched_gt_ids: set[int] = set()
-
-    for group in ALL_GROUPS:
-        preds = pred_by_group.get(group, [])
-        gts = gt_by_group.get(group, [])
-
-        # Build candidate pairs sorted by |time_diff| (greedy nearest-first)
-        candidates: list[tuple[float, DrumEvent, dict]] = []
-        for pred in preds:
-            for gt in gts:
-                diff = abs(pred.quantized_time - gt["quantized_time"])
-                if diff <= tolerance_s:
-                    candidates.append((diff, pred, gt))
-        candidates.sort(key=lambda x: x[0])
-
-        for diff, pred, gt in candidates:
-            pid = id(pred)
-            gid = id(gt)
-            if pid not in matched_pred_ids and gid not in matched_gt_ids:
-                matched.append((pred, gt))
-                matched_pred_ids.add(pid)
-                matched_gt_ids.add(gid)
-
-    unmatched_pred = [p for p in predicted if id(p) not in matched_pred_ids]
-    unmatched_gt = [g for g in ground_truth if id(g) not in matched_gt_ids]
+    if not predicted or not ground_truth:
+        return [], list(predicted), list(ground_truth)
 
-    return matched, unmatched_pred, unmatched_gt
+    pred = _snapshot_predicted(predicted)
+    gt = _snapshot_ground_truth(ground_truth)
+    matched_preds, matched_gts = _match_by_group(
+        pred.quantized_time, gt.quantized_time, pred.group, gt.group, tolerance_s
+    )
+    return _split_matches(predicted, ground_truth, matched_preds, matched_gts)
 
 
-def compute_f_measure(
-    predicted: list[DrumEvent],
-    ground_truth: list[dict],
-    tolerance_s: float = 0.05,
-) -> tuple[dict[str, dict], list[tuple[DrumEvent, dict]], list[DrumEvent], list[dict]]:
-    """Compute precision, recall, F1 per stem group and overall.
+def _f_measure_result(
+    pred_codes: np.ndarray, gt_codes: np.ndarray, matched_preds: np.ndarray
+) -> dict[str, dict]:
+    """Per-group and micro-averaged precision/recall/F1 from encoded groups.
 
-    Returns:
-        result: Dict {group: {precision, recall, f1, tp, fp, fn}} plus "overall" key
-        matched: Matched (pred, gt) pairs
-        unmatched_pred: False positives
-        unmatched_gt: False negatives
+    Rates are kept at full precision; they are rounded only for display and in
+    the JSON report.
     """
-    matched, unmatched_pred, unmatched_gt = match_events(predicted, ground_truth, tolerance_s)
-
-    stats: dict[str, dict[str, int]] = {g: {"tp": 0, "fp": 0, "fn": 0} for g in ALL_GROUPS}
-
-    for pred, gt in matched:
-        group = _pred_group(pred)
-        if group in stats:
-            stats[group]["tp"] += 1
-
-    for pred in unmatched_pred:
-        group = _pred_group(pred)
-        if group in stats:
-            stats[group]["fp"] += 1
-
-    for gt in unmatched_gt:
-        group = _gt_group(gt)
-        if group in stats:
-            stats[group]["fn"] += 1
+    # Pairs never cross groups, so per group: fp = preds - tp and fn = GTs - tp
+    num_groups = len(ALL_GROUPS)
+    tp_counts = np.bincount(pred_codes[matched_preds], minlength=num_groups)
+    fp_counts = np.bincount(pred_codes[pred_codes >= 0], minlength=num_groups) - tp_counts
+    fn_counts = np.bincount(gt_codes[gt_codes >= 0], minlength=num_groups) - tp_counts
 
     result: dict[str, dict] = {}
     total_tp = total_fp = total_fn = 0
 
-    for group, s in stats.items():
-        tp, fp, fn = s["tp"], s["fp"], s["fn"]
+    for group, tp, fp, fn in zip(
+        ALL_GROUPS, tp_counts.tolist(), fp_counts.tolist(), fn_counts.tolist(), strict=True
+    ):
         precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
         recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
         f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
         result[group] = {
-            "precision": round(precision, 4),
-            "recall": round(recall, 4),
-            "f1": round(f1, 4),
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
             "tp": tp,
             "fp": fp,
             "fn": fn,
@@ -151,14 +248,104 @@ def compute_f_measure(
     r = total_tp / (total_tp + total_fn) if (total_tp + total_fn) > 0 else 0.0
     f = 2 * p * r / (p + r) if (p + r) > 0 else 0.0
     result["overall"] = {
-        "precision": round(p, 4),
-        "recall": round(r, 4),
-        "f1": round(f, 4),
+        "precision": p,
+        "recall": r,
+        "f1": f,
         "tp": total_tp,
         "fp": total_fp,
         "fn": total_fn,
     }
+    return result
+
+
+def _onset_mae(pred_times: np.ndarray, gt_times: np.ndarray) -> float:
+    """Mean |pred - gt| in ms over aligned arrays of matched onset times."""
+    if len(pred_times) == 0:
+        return 0.0
+    errors = np.abs(pred_times - gt_times) * 1000.0
+    # Summed left to right in Python, like the original list-based version
+    return round(sum(errors.tolist()) / len(errors), 3)
+
+
+def _velocity_rmse(pred_velocities: np.ndarray, gt_velocities: np.ndarray) -> float:
+    """RMSE over aligned arrays of matched velocities."""
+    if len(pred_velocities) == 0:
+        return 0.0
+    sq_error_sum = int(((pred_velocities - gt_velocities) ** 2).sum())
+    return round(math.sqrt(sq_error_sum / len(pred_velocities)), 3)
+
+
+def _confusion_counts(
+    pred_times: np.ndarray,
+    gt_times: np.ndarray,
+    pred_codes: np.ndarray,
+    gt_codes: np.ndarray,
+    tolerance_s: float,
+) -> np.ndarray:
+    """5x5 (gt_group, pred_group) counts over a time-only greedy matching."""
+    matrix = np.zeros((5, 5), dtype=int)
+    pred_idx, gt_idx = _greedy_match(pred_times, gt_times, tolerance_s)
+    rows, cols = gt_codes[gt_idx], pred_codes[pred_idx]
+    known = (rows >= 0) & (cols >= 0)
+    np.add.at(matrix, (rows[known], cols[known]), 1)
+    return matrix
+
+
+def compute_all_metrics(
+    predicted: list[DrumEvent],
+    ground_truth: list[dict],
+    tolerance_s: float = 0.05,
+) -> tuple[dict[str, dict], float, float, np.ndarray]:
+    """F-measure, onset MAE, velocity RMSE and confusion matrix in one go.
+
+    Equivalent to compute_f_measure + compute_onset_mae + compute_velocity_rmse +
+    compute_confusion_matrix, but reads every event's fields into arrays once
+    and computes the error metrics on the matched indices directly.
+
+    Returns:
+        fm_result: As returned by compute_f_measure
+        onset_mae: Onset MAE in ms
+        vel_rmse: Velocity RMSE in MIDI units
+        confusion: 5x5 int array, rows=GT groups, cols=predicted groups
+    """
+    pred = _snapshot_predicted(predicted)
+    gt = _snapshot_ground_truth(ground_truth)
+
+    matched_preds, matched_gts = _match_by_group(
+        pred.quantized_time, gt.quantized_time, pred.group, gt.group, tolerance_s
+    )
+    fm_result = _f_measure_result(pred.group, gt.group, matched_preds)
+    onset_mae = _onset_mae(pred.time[matched_preds], gt.time[matched_gts])
+    vel_rmse = _velocity_rmse(pred.velocity[matched_preds], gt.velocity[matched_gts])
+    confusion = _confusion_counts(
+        pred.quantized_time, gt.quantized_time, pred.group, gt.group, tolerance_s
+    )
+    return fm_result, onset_mae, vel_rmse, confusion
 
+
+def compute_f_measure(
+    predicted: list[DrumEvent],
+    ground_truth: list[dict],
+    tolerance_s: float = 0.05,
+) -> tuple[dict[str, dict], list[tuple[DrumEvent, dict]], list[DrumEvent], list[dict]]:
+    """Compute precision, recall, F1 per stem group and overall.
+
+    Returns:
+        result: Dict {group: {precision, recall, f1, tp, fp, fn}} plus "overall" key
+        matched: Matched (pred, gt) pairs
+        unmatched_pred: False positives
+        unmatched_gt: False negatives
+    """
+    # Fields are read once and shared by the matching and the counts
+    pred = _snapshot_predicted(predicted)
+    gt = _snapshot_ground_truth(ground_truth)
+    matched_preds, matched_gts = _match_by_group(
+        pred.quantized_time, gt.quantized_time, pred.group, gt.group, tolerance_s
+    )
+    matched, unmatched_pred, unmatched_gt = _split_matches(
+        predicted, ground_truth, matched_preds, matched_gts
+    )
+    result = _f_measure_result(pred.group, gt.group, matched_preds)
     return result, matched, unmatched_pred, unmatched_gt
 
 
@@ -168,10 +355,10 @@ def compute_onset_mae(matched: list[tuple[DrumEvent, dict]]) -> float:
     Uses pred.time (pre-quantization) vs gt["time"] to measure onset detector accuracy.
     Returns 0.0 if no matched pairs.
     """
-    if not matched:
-        return 0.0
-    errors = [abs(pred.time - gt["time"]) * 1000.0 for pred, gt in matched]
-    return round(sum(errors) / len(errors), 3)
+    return _onset_mae(
+        np.array([pred.time for pred, _ in matched], dtype=np.float64),
+        np.array([gt["time"] for _, gt in matched], dtype=np.float64),
+    )
 
 
 def compute_velocity_rmse(matched: list[tuple[DrumEvent, dict]]) -> float:
@@ -179,10 +366,10 @@ def compute_velocity_rmse(matched: list[tuple[DrumEvent, dict]]) -> float:
 
     Returns 0.0 if no matched pairs.
     """
-    if not matched:
-        return 0.0
-    sq_errors = [(pred.velocity - gt["velocity"]) ** 2 for pred, gt in matched]
-    return round(math.sqrt(sum(sq_errors) / len(sq_errors)), 3)
+    return _velocity_rmse(
+        np.array([pred.velocity for pred, _ in matched], dtype=np.int64),
+        np.array([gt["velocity"] for _, gt in matched], dtype=np.int64),
+    )
 
 
 def compute_confusion_matrix(
@@ -199,32 +386,9 @@ def compute_confusion_matrix(
         matrix: 5×5 int array, rows=GT groups, cols=predicted groups
         groups: Ordered list of group names (row/col labels)
     """
-    group_to_idx = {g: i for i, g in enumerate(ALL_GROUPS)}
-    matrix = np.zeros((5, 5), dtype=int)
-
-    # Build all candidate (pred, gt) pairs with time-only matching
-    candidates: list[tuple[float, DrumEvent, dict]] = []
-    for pred in predicted:
-        for gt in ground_truth:
-            diff = abs(pred.quantized_time - gt["quantized_time"])
-            if diff <= tolerance_s:
-                candidates.append((diff, pred, gt))
-    candidates.sort(key=lambda x: x[0])
-
-    matched_pred_ids: set[int] = set()
-    matched_gt_ids: set[int] = set()
-
-    for diff, pred, gt in candidates:
-        pid = id(pred)
-        gid = id(gt)
-        if pid in matched_pred_ids or gid in matched_gt_ids:
-            continue
-        matched_pred_ids.add(pid)
-        matched_gt_ids.add(gid)
-
-        row = group_to_idx.get(_gt_group(gt), -1)
-        col = group_to_idx.get(_pred_group(pred), -1)
-        if row >= 0 and col >= 0:
-            matrix[row, col] += 1
-
+    pred = _snapshot_predicted(predicted)
+    gt = _snapshot_ground_truth(ground_truth)
+    matrix = _confusion_counts(
+        pred.quantized_time, gt.quantized_time, pred.group, gt.group, tolerance_s
+    )
     return matrix, ALL_GROUPS
@@ -7,6 +7,7 @@ No external data needed — all patterns are defined inline.
 from pathlib import Path
 
 import mido
+import numpy as np
 
 # Ticks per beat (quarter note)
 TICKS_PER_BEAT = 480
@@ -29,12 +30,12 @@ CRASH = 49
 RIDE = 51
 
 
-def _build_midi(events_per_bar: list[tuple[int, int, int]], bpm: float, bars: int = 8) -> mido.MidiFile:
+def _build_midi(events_per_bar: list[tuple[int, int, int]], tempo: int, bars: int = 8) -> mido.MidiFile:
     """Build a type-0 MIDI file from per-bar events.
 
     Args:
         events_per_bar: List of (tick_in_bar, note, velocity) tuples (one bar pattern)
-        bpm: Tempo in beats per minute
+        tempo: Tempo in microseconds per beat (see mido.bpm2tempo)
         bars: Number of bars to repeat
 
     Returns:
@@ -44,29 +45,37 @@ def _build_midi(events_per_bar: list[tuple[int, int, int]], bpm: float, bars: in
     track = mido.MidiTrack()
     mid.tracks.append(track)
 
-    tempo = mido.bpm2tempo(bpm)
     track.append(mido.MetaMessage("set_tempo", tempo=tempo, time=0))
 
-    # Build flat list of (abs_tick, sort_key, type, note, velocity)
-    # type 0 = note_on, type 1 = note_off  (sorted so note_on comes first at equal ticks)
-    messages: list[tuple[int, int, int, int, int]] = []
-    for bar in range(bars):
-        bar_start = bar * BAR
-        for tick_in_bar, note, velocity in events_per_bar:
-            abs_tick = bar_start + tick_in_bar
-            messages.append((abs_tick, 0, note, velocity, 0))        # note_on
-            messages.append((abs_tick + 10, 1, note, 0, 1))           # note_off
-
-    messages.sort(key=lambda x: (x[0], x[4]))  # sort by abs_tick, then type
-
-    current_tick = 0
-    for abs_tick, _type, note, velocity, msg_type in messages:
-        delta = abs_tick - current_tick
-        if msg_type == 0:
-            track.append(mido.Message("note_on", channel=9, note=note, velocity=velocity, time=delta))
-        else:
-            track.append(mido.Message("note_off", channel=9, note=note, velocity=0, time=delta))
-        current_tick = abs_tick
+    # Every (bar, event) as a note_on/note_off pair, laid out bar by bar in
+    # pattern order with each note_on directly followed by its note_off
+    pattern = np.array(events_per_bar, dtype=np.int64).reshape(-1, 3)
+    on_ticks = (np.arange(bars)[:, None] * BAR + pattern[:, 0]).ravel()
+    ticks = np.column_stack((on_ticks, on_ticks + 10)).ravel()
+    is_off = np.tile([0, 1], len(on_ticks))  # note_on first at equal ticks
+    notes = np.repeat(np.tile(pattern[:, 1], bars), 2)
+    velocities = np.column_stack(
+        (np.tile(pattern[:, 2], bars), np.zeros(len(on_ticks), dtype=np.int64))
+    ).ravel()
+
+    # Stable sort by (abs_tick, type), then emit with delta times
+    order = np.lexsort((is_off, ticks))
+    deltas = np.diff(ticks[order], prepend=0)
+    for delta, off, note, velocity in zip(
+        deltas.tolist(),
+        is_off[order].tolist(),
+        notes[order].tolist(),
+        velocities[order].tolist(),
+        strict=True,
+    ):
+        # Values come from the pattern tables and are already valid, so mido's
+        # per-field validation (most of the build time) is skipped
+        msg_type = "note_off" if off else "note_on"
+        track.append(
+            mido.Message(
+                msg_type, skip_checks=True, channel=9, note=note, velocity=velocity, time=delta
+            )
+        )
 
     track.append(mido.MetaMessage("end_of_track", time=1))
     return mid
@@ -150,9 +159,10 @@ def generate_simple_patterns(output_dir: Path, bpm: float = 120.0) -> list[Path]
         ],
     }
 
+    tempo = mido.bpm2tempo(bpm)
     created: list[Path] = []
     for name, events in patterns.items():
-        mid = _build_midi(events, bpm=bpm, bars=8)
+        mid = _build_midi(events, tempo=tempo, bars=8)
         out_path = output_dir / f"{name}.mid"
         mid.save(str(out_path))
         created.append(out_path)
@@ -1,11 +1,17 @@
 """Terminal table formatting and JSON report writer for evaluation results."""
 
-import json
-import statistics
 from pathlib import Path
 
+import numpy as np
+from pydantic import TypeAdapter
+
 from eval.metrics import ALL_GROUPS
 
+# F-measure fields computed at full precision and rounded only on output
+RATE_KEYS = ("precision", "recall", "f1")
+
+_results_adapter = TypeAdapter(list[dict])
+
 
 def _fmt(val: float, decimals: int = 3) -> str:
     return f"{val:.{decimals}f}"
@@ -15,38 +21,51 @@ def _pct(val: float) -> str:
     return f"{val * 100:.1f}%"
 
 
-def print_sample_table(sample_name: str, fm_result: dict, onset_mae: float, vel_rmse: float) -> None:
-    """Print per-sample metrics table to terminal."""
-    col_w = 10
-    headers = ["Group", "P", "R", "F1", "TP", "FP", "FN"]
-    widths = [10, 8, 8, 8, 6, 6, 6]
-
+def _table_templates(headers: list[str], widths: list[int]) -> tuple[str, str, str]:
+    """Separator line, header row and a centered-cell row format for a table."""
     sep = "+" + "+".join("-" * w for w in widths) + "+"
-    header_row = "|" + "|".join(h.center(w) for h, w in zip(headers, widths)) + "|"
+    row_fmt = "|" + "|".join(f"{{:^{w}}}" for w in widths) + "|"
+    return sep, row_fmt.format(*headers), row_fmt
+
+
+# Column layouts are fixed, so the table templates are built once. (Widths are
+# even, where "{:^w}" pads exactly like str.center.)
+SAMPLE_SEP, SAMPLE_HEADER, SAMPLE_ROW_FMT = _table_templates(
+    ["Group", "P", "R", "F1", "TP", "FP", "FN"], [10, 8, 8, 8, 6, 6, 6]
+)
+AGGREGATE_SEP, AGGREGATE_HEADER, AGGREGATE_ROW_FMT = _table_templates(
+    ["Group", "F1 mean", "F1 std", "P mean", "R mean"], [10, 10, 10, 10, 10]
+)
 
-    print(f"\n{'=' * 56}")
-    print(f"  Sample: {sample_name}")
-    print(f"  Onset MAE: {_fmt(onset_mae)} ms   Velocity RMSE: {_fmt(vel_rmse)}")
-    print(sep)
-    print(header_row)
-    print(sep)
 
-    for group in ALL_GROUPS + ["overall"]:
+def print_sample_table(sample_name: str, fm_result: dict, onset_mae: float, vel_rmse: float) -> None:
+    """Print per-sample metrics table to terminal."""
+    lines = [
+        f"\n{'=' * 56}",
+        f"  Sample: {sample_name}",
+        f"  Onset MAE: {_fmt(onset_mae)} ms   Velocity RMSE: {_fmt(vel_rmse)}",
+        SAMPLE_SEP,
+        SAMPLE_HEADER,
+        SAMPLE_SEP,
+    ]
+
+    for group in [*ALL_GROUPS, "overall"]:
         s = fm_result.get(group, {})
-        row = (
-            f"|{group.center(widths[0])}"
-            f"|{_pct(s.get('precision', 0)).center(widths[1])}"
-            f"|{_pct(s.get('recall', 0)).center(widths[2])}"
-            f"|{_pct(s.get('f1', 0)).center(widths[3])}"
-            f"|{str(s.get('tp', 0)).center(widths[4])}"
-            f"|{str(s.get('fp', 0)).center(widths[5])}"
-            f"|{str(s.get('fn', 0)).center(widths[6])}"
-            f"|"
-        )
         if group == "overall":
-            print(sep)
-        print(row)
-    print(sep)
+            lines.append(SAMPLE_SEP)
+        lines.append(
+            SAMPLE_ROW_FMT.format(
+                group,
+                _pct(s.get("precision", 0)),
+                _pct(s.get("recall", 0)),
+                _pct(s.get("f1", 0)),
+                s.get("tp", 0),
+                s.get("fp", 0),
+                s.get("fn", 0),
+            )
+        )
+    lines.append(SAMPLE_SEP)
+    print("\n".join(lines))
 
 
 def print_aggregate_table(all_results: list[dict]) -> None:
@@ -54,48 +73,53 @@ def print_aggregate_table(all_results: list[dict]) -> None:
     if not all_results:
         return
 
-    print(f"\n{'=' * 56}")
-    print("  AGGREGATE (mean ± std across all samples)")
-
-    col_w = 10
-    headers = ["Group", "F1 mean", "F1 std", "P mean", "R mean"]
-    widths = [10, 10, 10, 10, 10]
-    sep = "+" + "+".join("-" * w for w in widths) + "+"
-    header_row = "|" + "|".join(h.center(w) for h, w in zip(headers, widths)) + "|"
-
-    print(sep)
-    print(header_row)
-    print(sep)
-
-    for group in ALL_GROUPS + ["overall"]:
-        f1s = [r["fm"].get(group, {}).get("f1", 0.0) for r in all_results]
-        ps = [r["fm"].get(group, {}).get("precision", 0.0) for r in all_results]
-        rs = [r["fm"].get(group, {}).get("recall", 0.0) for r in all_results]
-
-        mean_f1 = statistics.mean(f1s) if f1s else 0.0
-        std_f1 = statistics.stdev(f1s) if len(f1s) > 1 else 0.0
-        mean_p = statistics.mean(ps) if ps else 0.0
-        mean_r = statistics.mean(rs) if rs else 0.0
-
-        row = (
-            f"|{group.center(widths[0])}"
-            f"|{_pct(mean_f1).center(widths[1])}"
-            f"|{('±' + _pct(std_f1)).center(widths[2])}"
-            f"|{_pct(mean_p).center(widths[3])}"
-            f"|{_pct(mean_r).center(widths[4])}"
-            f"|"
-        )
+    lines = [
+        f"\n{'=' * 56}",
+        "  AGGREGATE (mean ± std across all samples)",
+        AGGREGATE_SEP,
+        AGGREGATE_HEADER,
+        AGGREGATE_SEP,
+    ]
+
+    # (sample, group, [f1, precision, recall]) stacked once, reduced per column
+    groups = [*ALL_GROUPS, "overall"]
+    scores = np.array(
+        [
+            [
+                [
+                    r["fm"].get(group, {}).get("f1", 0.0),
+                    r["fm"].get(group, {}).get("precision", 0.0),
+                    r["fm"].get(group, {}).get("recall", 0.0),
+                ]
+                for group in groups
+            ]
+            for r in all_results
+        ],
+        dtype=np.float64,
+    )
+    means = scores.mean(axis=0)
+    # ddof=1 gives the sample standard deviation, as statistics.stdev does
+    std_f1s = scores[:, :, 0].std(axis=0, ddof=1) if len(scores) > 1 else np.zeros(len(groups))
+
+    for group, (mean_f1, mean_p, mean_r), std_f1 in zip(
+        groups, means.tolist(), std_f1s.tolist(), strict=True
+    ):
         if group == "overall":
-            print(sep)
-        print(row)
-    print(sep)
+            lines.append(AGGREGATE_SEP)
+        lines.append(
+            AGGREGATE_ROW_FMT.format(
+                group, _pct(mean_f1), "±" + _pct(std_f1), _pct(mean_p), _pct(mean_r)
+            )
+        )
+    lines.append(AGGREGATE_SEP)
 
     # Summary line
-    maes = [r["onset_mae"] for r in all_results]
-    rmses = [r["vel_rmse"] for r in all_results]
-    print(f"  Onset MAE: {statistics.mean(maes):.2f} ± {statistics.stdev(maes) if len(maes) > 1 else 0:.2f} ms")
-    print(f"  Velocity RMSE: {statistics.mean(rmses):.2f} ± {statistics.stdev(rmses) if len(rmses) > 1 else 0:.2f}")
-    print()
+    errors = np.array([[r["onset_mae"], r["vel_rmse"]] for r in all_results], dtype=np.float64)
+    error_means = errors.mean(axis=0)
+    error_stds = errors.std(axis=0, ddof=1) if len(errors) > 1 else np.zeros(2)
+    lines.append(f"  Onset MAE: {error_means[0]:.2f} ± {error_stds[0]:.2f} ms")
+    lines.append(f"  Velocity RMSE: {error_means[1]:.2f} ± {error_stds[1]:.2f}")
+    print("\n".join(lines) + "\n")
 
 
 def print_confusion_matrix(matrix, groups: list[str]) -> None:
@@ -111,9 +135,23 @@ def print_confusion_matrix(matrix, groups: list[str]) -> None:
     print()
 
 
+def _round_rates(result: dict) -> dict:
+    """Copy of a sample result with its F-measure rates rounded to 4 decimals."""
+    fm = {
+        group: {key: round(val, 4) if key in RATE_KEYS else val for key, val in stats.items()}
+        for group, stats in result["fm"].items()
+    }
+    return {**result, "fm": fm}
+
+
 def write_json_report(output_path: Path, all_results: list[dict]) -> None:
     """Write results to JSON file."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(all_results, f, indent=2, default=lambda x: x.tolist() if hasattr(x, "tolist") else x)
+    # Serialized by pydantic in Rust; NumPy values (the only non-JSON types that
+    # can appear) reach the fallback, nothing else pays for a Python callback
+    output_path.write_bytes(
+        _results_adapter.dump_json(
+            [_round_rates(r) for r in all_results], indent=2, fallback=lambda x: x.tolist()
+        )
+    )
     print(f"Results written to {output_path}")